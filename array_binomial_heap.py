@@ -0,0 +1,371 @@
+import unittest
+from array import array
+
+NIL = -1
+
+
+class NodeArrays:
+    """
+    parallel columns holding every node of one or more array binomial heaps
+    a node lives in a slot; callers only see its handle, which never changes while the node is in a heap
+    the slot of an extracted or deleted node is freed, and reused with its handle by a later new
+    """
+    def __init__(self):
+        self.key = []
+        self.p = array('i')
+        self.child = array('i')
+        self.sibling = array('i')
+        self.degree = array('B')
+        # owner[slot] is the handle stored in slot, slot[handle] is where that handle lives
+        self.owner = array('i')
+        self.slot = array('i')
+        # free slots, each still paired with a handle in owner and slot
+        self.free = array('i')
+
+    def new(self, key):
+        """
+        allocate a new root node, in a free slot when there is one
+        :param key: key of the new node
+        :return: int, slot of the new node, its handle is owner[slot]
+        """
+        if self.free:
+            s = self.free.pop()
+            self.key[s] = key
+            return s
+        s = len(self.key)
+        self.key.append(key)
+        self.p.append(NIL)
+        self.child.append(NIL)
+        self.sibling.append(NIL)
+        self.degree.append(0)
+        self.owner.append(s)
+        self.slot.append(s)
+        return s
+
+    def nbytes(self):
+        """
+        bytes used by the columns, without the key objects themselves
+        :return: int
+        """
+        size = 0
+        for a in (self.p, self.child, self.sibling, self.degree, self.owner, self.slot, self.free):
+            size += a.buffer_info()[1] * a.itemsize
+        return size + len(self.key) * array('l').itemsize
+
+    def link(self, y, z):
+        """
+        make slot y the new head of the linked list of slot z's children
+        :param y: int, new child head
+        :param z: int, parent slot
+        """
+        self.p[y] = z
+        self.sibling[y] = self.child[z]
+        self.child[z] = y
+        self.degree[z] += 1
+
+    def reverse_child(self, x):
+        """
+        detach and reverse the child list of slot x
+        :param x: int, slot
+        :return: int, head slot of the reversed list
+        """
+        c_head = NIL
+        c = self.child[x]
+        while c != NIL:
+            q = self.sibling[c]
+            self.sibling[c] = c_head
+            self.p[c] = NIL
+            c_head = c
+            c = q
+        self.child[x] = NIL
+        return c_head
+
+
+class ArrayBinomialHeap:
+    """
+    binomial heap keeping its nodes in NodeArrays columns and handing out integer handles
+    """
+    def __init__(self, nodes=None):
+        self.nodes = nodes if nodes is not None else NodeArrays()
+        self.head = NIL
+        self.n = 0
+
+    def make_heap(self):
+        """
+        create a new empty heap that shares node storage with self, so the two can be united
+        :return: new heap
+        """
+        return ArrayBinomialHeap(self.nodes)
+
+    def key(self, x):
+        """
+        key of handle x
+        :param x: int, handle
+        :return: key
+        """
+        return self.nodes.key[self.nodes.slot[x]]
+
+    def _min_slot(self):
+        """
+        :return: (slot of min root, slot before it in the root list)
+        """
+        nodes = self.nodes
+        key = nodes.key
+        sibling = nodes.sibling
+        y = self.head
+        prev_y = NIL
+        if y == NIL:
+            return y, prev_y
+        prev = y
+        x = sibling[y]
+        while x != NIL:
+            if key[x] < key[y]:
+                y = x
+                prev_y = prev
+            prev = x
+            x = sibling[x]
+        return y, prev_y
+
+    def minimum(self):
+        """
+        return the min handle
+        :return: int, handle with min key, None if heap is empty
+        """
+        y = self._min_slot()[0]
+        if y == NIL:
+            return None
+        return self.nodes.owner[y]
+
+    def _merge(self, h2):
+        """
+        merge the root lists starting at self.head and h2 into a single linked list sorted by degree
+        :param h2: int, head slot of the other root list
+        :return: int, head slot of merged list
+        """
+        degree = self.nodes.degree
+        sibling = self.nodes.sibling
+        p = self.head
+        q = h2
+        if p == NIL:
+            return q
+        elif q == NIL:
+            return p
+        if degree[p] < degree[q]:
+            head = p
+            p = sibling[p]
+        else:
+            head = q
+            q = sibling[q]
+        k = head
+        while p != NIL and q != NIL:
+            if degree[p] < degree[q]:
+                sibling[k] = p
+                p = sibling[p]
+            else:
+                sibling[k] = q
+                q = sibling[q]
+            k = sibling[k]
+        sibling[k] = p if p != NIL else q
+        return head
+
+    def _union(self, h2):
+        """
+        unite self with the root list starting at slot h2
+        :param h2: int, head slot of the other root list
+        """
+        nodes = self.nodes
+        key = nodes.key
+        degree = nodes.degree
+        sibling = nodes.sibling
+        self.head = self._merge(h2)
+        if self.head == NIL:
+            return
+        prev_x = NIL
+        x = self.head
+        next_x = sibling[x]
+        while next_x != NIL:
+            if degree[x] != degree[next_x] or \
+                    (sibling[next_x] != NIL and degree[sibling[next_x]] == degree[x]):
+                prev_x = x
+                x = next_x
+            else:
+                if key[x] <= key[next_x]:
+                    sibling[x] = sibling[next_x]
+                    nodes.link(next_x, x)
+                else:
+                    if prev_x == NIL:
+                        self.head = next_x
+                    else:
+                        sibling[prev_x] = next_x
+                    nodes.link(x, next_x)
+                    x = next_x
+            next_x = sibling[x]
+
+    def union(self, h1):
+        """
+        unites self and h1, h1 is left empty
+        :param h1: ArrayBinomialHeap sharing node storage with self
+        :raise Exception if h1 does not share node storage with self
+        """
+        if h1.nodes is not self.nodes:
+            raise Exception('heaps do not share node storage')
+        self._union(h1.head)
+        self.n += h1.n
+        h1.head = NIL
+        h1.n = 0
+
+    def insert(self, k):
+        """
+        insert a new node with key k
+        :param k: key
+        :return: int, handle of the new node
+        """
+        x = self.nodes.new(k)
+        self._union(x)
+        self.n += 1
+        return self.nodes.owner[x]
+
+    def _remove_root(self, x, prev_x):
+        """
+        remove root slot x from the root list, union its children back in and free x
+        :param x: int, slot of a root
+        :param prev_x: int, slot before x in the root list
+        """
+        sibling = self.nodes.sibling
+        if prev_x == NIL:
+            self.head = sibling[x]
+        else:
+            sibling[prev_x] = sibling[x]
+        sibling[x] = NIL
+        self._union(self.nodes.reverse_child(x))
+        self.nodes.degree[x] = 0
+        self.nodes.free.append(x)
+        self.n -= 1
+
+    def extract_min(self):
+        """
+        extract the node with the minimum key, and reshape the heap
+        the handle is freed: its key can be read until the next insert, which may reuse it
+        :return: int, handle with minimum key, None if heap is empty
+        """
+        x, prev_x = self._min_slot()
+        if x == NIL:
+            return None
+        self._remove_root(x, prev_x)
+        return self.nodes.owner[x]
+
+    def _sift_up(self, y, force=False):
+        """
+        move the handle in slot y up while its key is smaller than its parent's
+        :param y: int, slot
+        :param force: bool, move all the way up to the root regardless of keys
+        :return: int, slot the handle ended up in
+        """
+        nodes = self.nodes
+        key = nodes.key
+        owner = nodes.owner
+        slot = nodes.slot
+        z = nodes.p[y]
+        while z != NIL and (force or key[y] < key[z]):
+            key[y], key[z] = key[z], key[y]
+            owner[y], owner[z] = owner[z], owner[y]
+            slot[owner[y]] = y
+            slot[owner[z]] = z
+            y = z
+            z = nodes.p[y]
+        return y
+
+    def decrease_key(self, x, k):
+        """
+        decrease the key of handle x to k, k should be smaller than its key
+        :param x: int, handle
+        :param k: new key
+        :raise Exception if k > current key
+        """
+        s = self.nodes.slot[x]
+        if k > self.nodes.key[s]:
+            raise Exception('new key is greater than current key')
+        self.nodes.key[s] = k
+        self._sift_up(s)
+
+    def delete(self, x):
+        """
+        delete handle x from heap, x is freed and may be reused by the next insert
+        :param x: int, handle
+        """
+        y = self._sift_up(self.nodes.slot[x], force=True)
+        sibling = self.nodes.sibling
+        prev_y = NIL
+        p = self.head
+        while p != y:
+            prev_y = p
+            p = sibling[p]
+        self._remove_root(y, prev_y)
+
+
+class TestArrayBinomialHeap(unittest.TestCase):
+    def test_insert_extract(self):
+        h = ArrayBinomialHeap()
+        keys = [12, 7, 25, 15, 33, 28, 41, 18, 3, 37]
+        handles = [h.insert(k) for k in keys]
+        self.assertEqual(h.n, len(keys))
+        self.assertEqual(h.key(h.minimum()), 3)
+        out = []
+        while h.n:
+            x = h.extract_min()
+            out.append(h.key(x))
+        self.assertEqual(out, sorted(keys))
+        self.assertEqual(handles, list(range(len(keys))))
+        self.assertTrue(h.extract_min() is None)
+
+    def test_union(self):
+        h1 = ArrayBinomialHeap()
+        h2 = h1.make_heap()
+        for k in [5, 1, 9]:
+            h1.insert(k)
+        for k in [4, 0, 8, 2]:
+            h2.insert(k)
+        h1.union(h2)
+        self.assertEqual(h1.n, 7)
+        self.assertEqual(h2.n, 0)
+        self.assertEqual([h1.key(h1.extract_min()) for _ in range(7)], [0, 1, 2, 4, 5, 8, 9])
+        self.assertRaises(Exception, h1.union, ArrayBinomialHeap())
+
+    def test_decrease_key_keeps_handles(self):
+        h = ArrayBinomialHeap()
+        handles = [h.insert(k) for k in range(10, 26)]
+        x = handles[-1]
+        h.decrease_key(x, 1)
+        self.assertEqual(h.minimum(), x)
+        self.assertEqual(h.key(x), 1)
+        for i, y in enumerate(handles[:-1]):
+            self.assertEqual(h.key(y), 10 + i)
+        self.assertRaises(Exception, h.decrease_key, x, 2)
+
+    def test_delete(self):
+        h = ArrayBinomialHeap()
+        handles = [h.insert(k) for k in range(16)]
+        h.delete(handles[7])
+        h.delete(handles[0])
+        out = [h.key(h.extract_min()) for _ in range(h.n)]
+        self.assertEqual(out, [k for k in range(16) if k not in (0, 7)])
+
+    def test_slots_are_reused(self):
+        h = ArrayBinomialHeap()
+        handles = [h.insert(k) for k in range(100)]
+        for k in range(100, 100 + 10000):
+            x = h.insert(k)
+            self.assertEqual(h.key(h.extract_min()), k - 100)
+        self.assertEqual(len(h.nodes.key), 101)
+        self.assertEqual(h.key(x), 100 + 9999)
+        h.delete(x)
+        y = h.insert(-1)
+        self.assertEqual(y, x)
+        self.assertEqual(h.key(h.minimum()), -1)
+        self.assertEqual([h.key(h.extract_min()) for _ in range(h.n)], [-1] + list(range(10000, 10099)))
+        self.assertEqual(sorted(h.nodes.free), list(range(101)))
+        self.assertEqual(sorted(h.insert(k) for k in range(101)), sorted(handles + [x]))
+
+
+if __name__ == '__main__':
+    unittest.main()
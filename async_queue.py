@@ -0,0 +1,216 @@
+import asyncio
+import collections
+import time
+import unittest
+
+from fibonacci_heap import FibonacciHeap, Node
+from heap_stats import Histogram
+
+
+class AsyncPriorityQueue:
+    """
+    asyncio priority queue over a FibonacciHeap whose entries can be reprioritized or cancelled
+    put_nowait returns the node of the entry as its handle. a blocked get is woken once per
+    entry added, and takes the minimum when it resumes, so it sees every reprioritization made
+    in the meantime. needs Python 3
+    """
+    def __init__(self):
+        self.heap = FibonacciHeap()
+        # nodes in the heap, so stale handles are told apart from queued ones
+        self.handles = set()
+        # futures of the blocked get calls, oldest first
+        self.getters = collections.deque()
+
+    def __len__(self):
+        return len(self.handles)
+
+    def qsize(self):
+        return len(self.handles)
+
+    def empty(self):
+        return not self.handles
+
+    def wake_next(self):
+        """
+        wake the oldest blocked get call, if any
+        """
+        while self.getters:
+            getter = self.getters.popleft()
+            if not getter.done():
+                getter.set_result(None)
+                return
+
+    def put_nowait(self, key, item=None):
+        """
+        add item with priority key
+        :param key: priority of item
+        :param item: item
+        :return: Node, handle of the entry
+        """
+        x = Node(key, item)
+        self.heap.insert(x)
+        self.handles.add(x)
+        self.wake_next()
+        return x
+
+    async def put(self, key, item=None):
+        """
+        same as put_nowait, the queue is unbounded so it never blocks
+        """
+        return self.put_nowait(key, item)
+
+    def get_nowait(self):
+        """
+        remove and return the entry with minimum priority
+        :return: (key, item)
+        :raise asyncio.QueueEmpty if the queue is empty
+        """
+        if not self.handles:
+            raise asyncio.QueueEmpty()
+        x = self.heap.extract_min()
+        self.handles.discard(x)
+        return x.key, x.payload
+
+    async def get(self):
+        """
+        remove and return the entry with minimum priority, waiting for one if the queue is empty
+        :return: (key, item)
+        """
+        while not self.handles:
+            getter = asyncio.get_running_loop().create_future()
+            self.getters.append(getter)
+            try:
+                await getter
+            except asyncio.CancelledError:
+                # if this getter was already woken, pass the wake up on to the next one
+                if getter.done() and not getter.cancelled() and self.handles:
+                    self.wake_next()
+                raise
+        return self.get_nowait()
+
+    def reprioritize(self, handle, key):
+        """
+        change the priority of a queued entry, with decrease_key when it goes down
+        :param handle: Node, returned by put_nowait
+        :param key: new priority
+        :raise KeyError if the entry is not in the queue anymore
+        """
+        if handle not in self.handles:
+            raise KeyError('entry is not in the queue')
+        if key <= handle.key:
+            self.heap.decrease_key(handle, key)
+        else:
+            self.heap.delete(handle)
+            handle.key = key
+            handle.degree = 0
+            handle.mark = False
+            self.heap.insert(handle)
+
+    def cancel(self, handle):
+        """
+        remove a queued entry
+        :param handle: Node, returned by put_nowait
+        :return: bool, False if the entry was not in the queue anymore
+        """
+        if handle not in self.handles:
+            return False
+        self.handles.remove(handle)
+        self.heap.delete(handle)
+        return True
+
+
+async def latency_workload(q, put, keys, consumers=4):
+    """
+    one producer puts keys in batches of 64, yielding to the event loop after each batch,
+    and consumer tasks get them, recording the time from put to get of every key
+    :param q: AsyncPriorityQueue or asyncio.PriorityQueue, get returns (key, index of key)
+    :param put: function (q, key, index of key), put without waiting
+    :param keys: list of keys
+    :param consumers: int, number of consumer tasks
+    :return: dict, ops per second, and p50, p99 and max latency in seconds
+    """
+    n = len(keys)
+    put_times = [0.0] * n
+    latency = Histogram()
+
+    async def produce():
+        for i, k in enumerate(keys):
+            put_times[i] = time.time()
+            put(q, k, i)
+            if i % 64 == 63:
+                await asyncio.sleep(0)
+
+    async def consume(count):
+        for _ in range(count):
+            i = (await q.get())[1]
+            latency.add(time.time() - put_times[i])
+
+    tasks = [consume(n // consumers + (1 if c < n % consumers else 0)) for c in range(consumers)]
+    t = time.time()
+    await asyncio.gather(produce(), *tasks)
+    t = time.time() - t
+    s = latency.snapshot()
+    return {'ops': n / t, 'p50': s['p50'], 'p99': s['p99'], 'max': s['max']}
+
+
+class TestAsyncPriorityQueue(unittest.TestCase):
+    def test_order_and_handles(self):
+        async def main():
+            q = AsyncPriorityQueue()
+            handles = dict((c, q.put_nowait(10 * (i + 1), c)) for i, c in enumerate('abcdef'))
+            self.assertEqual(q.qsize(), 6)
+            q.reprioritize(handles['e'], 5)
+            q.reprioritize(handles['a'], 100)
+            self.assertTrue(q.cancel(handles['c']))
+            self.assertFalse(q.cancel(handles['c']))
+            out = [await q.get() for _ in range(5)]
+            self.assertEqual(out, [(5, 'e'), (20, 'b'), (40, 'd'), (60, 'f'), (100, 'a')])
+            self.assertTrue(q.empty())
+            self.assertRaises(asyncio.QueueEmpty, q.get_nowait)
+            self.assertRaises(KeyError, q.reprioritize, handles['a'], 1)
+        asyncio.run(main())
+
+    def test_waiters(self):
+        async def main():
+            q = AsyncPriorityQueue()
+            got = []
+
+            async def consume():
+                got.append(await q.get())
+
+            consumers = [asyncio.ensure_future(consume()) for _ in range(3)]
+            await asyncio.sleep(0)
+            self.assertEqual(len(q.getters), 3)
+            low = q.put_nowait(30, 'x')
+            q.put_nowait(20, 'y')
+            q.put_nowait(10, 'z')
+            # the woken getters take the minimum when they run, after this reprioritization
+            q.reprioritize(low, 1)
+            await asyncio.gather(*consumers)
+            self.assertEqual(got, [(1, 'x'), (10, 'z'), (20, 'y')])
+        asyncio.run(main())
+
+    def test_cancelled_getter(self):
+        async def main():
+            q = AsyncPriorityQueue()
+            first = asyncio.ensure_future(q.get())
+            second = asyncio.ensure_future(q.get())
+            await asyncio.sleep(0)
+            q.put_nowait(1, 'a')
+            first.cancel()
+            self.assertEqual(await second, (1, 'a'))
+            self.assertTrue(first.cancelled())
+        asyncio.run(main())
+
+    def test_latency_workload(self):
+        keys = [5, 3, 9, 1, 7] * 40
+        for q, put in ((AsyncPriorityQueue(), lambda q, k, i: q.put_nowait(k, i)),
+                       (asyncio.PriorityQueue(), lambda q, k, i: q.put_nowait((k, i)))):
+            r = asyncio.run(latency_workload(q, put, keys, consumers=3))
+            self.assertTrue(r['ops'] > 0)
+            self.assertTrue(r['p50'] <= r['p99'] <= r['max'])
+            self.assertTrue(q.empty())
+
+
+if __name__ == '__main__':
+    unittest.main()
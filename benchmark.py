@@ -0,0 +1,736 @@
+import argparse
+import gc
+import heapq
+import itertools
+import json
+import os
+import random
+import resource
+import subprocess
+import threading
+import sys
+import time
+
+import binomial_heap
+import fibonacci_heap
+import graph
+import merge
+import pairing_heap
+import priority_queue
+from array_binomial_heap import ArrayBinomialHeap
+from heap_stats import HeapStats
+from multiqueue import Empty, MultiQueue
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+
+def object_bytes(nodes):
+    """
+    bytes used by node objects, including their instance dicts and the handles insert gave out for them
+    :param nodes: list[Node]
+    :return: int
+    """
+    size = 0
+    for x in nodes:
+        size += sys.getsizeof(x)
+        if hasattr(x, '__dict__'):
+            size += sys.getsizeof(x.__dict__)
+        handle = getattr(x, 'handle', None)
+        if handle is not None:
+            size += sys.getsizeof(handle)
+    return size
+
+
+def traced_bytes(build):
+    """
+    bytes allocated by build(), measured with tracemalloc when it is available
+    and with object_bytes over the returned nodes otherwise
+    :param build: function returning a list of nodes
+    :return: (int, list of nodes)
+    """
+    if tracemalloc is None:
+        nodes = build()
+        return object_bytes(nodes), nodes
+    tracemalloc.start()
+    nodes = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size, nodes
+
+
+def bench_array_engine(n, seed=0):
+    """
+    compare memory retained after the inserts and insert/extract throughput of BinomialHeap and
+    ArrayBinomialHeap
+    :param n: int, number of elements
+    :param seed: int, random seed
+    :return: dict, results per engine
+    """
+    rng = random.Random(seed)
+    keys = [rng.randint(0, n * 10) for _ in range(n)]
+    results = {}
+
+    nodes = [binomial_heap.Node(k) for k in keys]
+    h = binomial_heap.BinomialHeap()
+    t = time.time()
+    for x in nodes:
+        h.insert(x)
+    t_insert = time.time() - t
+    mem = object_bytes(nodes)
+    t = time.time()
+    for _ in range(n):
+        h.extract_min()
+    t_extract = time.time() - t
+    results['object'] = {'bytes_per_element': float(mem) / n,
+                         'insert_ops': n / t_insert,
+                         'extract_ops': n / t_extract}
+
+    a = ArrayBinomialHeap()
+    t = time.time()
+    for k in keys:
+        a.insert(k)
+    t_insert = time.time() - t
+    mem = a.nodes.nbytes()
+    t = time.time()
+    for _ in range(n):
+        a.extract_min()
+    t_extract = time.time() - t
+    results['array'] = {'bytes_per_element': float(mem) / n,
+                        'insert_ops': n / t_insert,
+                        'extract_ops': n / t_extract}
+    return results
+
+
+def bench_incremental(n, seed=0):
+    """
+    per-operation latency of FibonacciHeap with full and incremental consolidation
+    a burst of n inserts is followed by n mixed extract_min/insert/decrease_key operations, then by
+    a burst of n / 4 decrease_key calls that cut, and n / 10 extract_min calls
+    :param n: int, burst size
+    :param seed: int, random seed
+    :return: dict, results per mode
+    """
+    results = {}
+    for mode, budget in (('full', None), ('incremental', 4)):
+        rng = random.Random(seed)
+        h = fibonacci_heap.FibonacciHeap(consolidate_budget=budget)
+        stats = HeapStats()
+        stats.attach(h)
+        nodes = [fibonacci_heap.Node(rng.randint(0, n * 10)) for _ in range(n)]
+        for x in nodes:
+            h.insert(x)
+        for _ in range(n):
+            r = rng.random()
+            if r < 0.4:
+                h.extract_min()
+            elif r < 0.7:
+                x = fibonacci_heap.Node(rng.randint(0, n * 10))
+                h.insert(x)
+                nodes.append(x)
+            else:
+                x = nodes[rng.randrange(len(nodes))]
+                if x.left is not None:
+                    h.decrease_key(x, x.key - rng.randint(0, n))
+        live = [x for x in nodes if x.left is not None]
+        for x in rng.sample(live, min(len(live), n // 4)):
+            h.decrease_key(x, x.key - n * 10)
+        t = time.time()
+        for _ in range(n // 10):
+            h.extract_min()
+        burst_extract = time.time() - t
+        latency = stats.snapshot()['latency']
+        results[mode] = {'max_ms': max(lat['max'] for lat in latency.values()) * 1000,
+                         'extract_p99_ms': latency['extract_min']['p99'] * 1000,
+                         'extract_max_ms': latency['extract_min']['max'] * 1000,
+                         'insert_max_ms': latency['insert']['max'] * 1000,
+                         'burst_extract_ms': burst_extract * 1000}
+    return results
+
+
+def bench_lazy(n, seed=0):
+    """
+    insert-heavy workload on eager and lazy BinomialHeap: n inserts, then n / 100 extract_min calls
+    :param n: int, number of inserts
+    :param seed: int, random seed
+    :return: dict, results per mode
+    """
+    rng = random.Random(seed)
+    keys = [rng.randint(0, n * 10) for _ in range(n)]
+    results = {}
+    for mode, lazy in (('eager', False), ('lazy', True)):
+        nodes = [binomial_heap.Node(k) for k in keys]
+        h = binomial_heap.BinomialHeap(lazy=lazy)
+        t = time.time()
+        for x in nodes:
+            h.insert(x)
+        t_insert = time.time() - t
+        t = time.time()
+        for _ in range(max(1, n // 100)):
+            h.extract_min()
+        t_extract = time.time() - t
+        results[mode] = {'insert_ops': n / t_insert,
+                         'extract_seconds': t_extract,
+                         'total_seconds': t_insert + t_extract}
+    return results
+
+
+def bench_node_memory(n, seed=0):
+    """
+    bytes per element retained once the elements are inserted, handles included, and
+    insert/extract_min throughput of both node classes
+    memory is traced in a separate run, so that tracing does not slow the timed one
+    :param n: int, number of elements
+    :param seed: int, random seed
+    :return: dict, results per heap
+    """
+    rng = random.Random(seed)
+    keys = [rng.randint(0, n * 10) for _ in range(n)]
+    results = {}
+    for name, module, heap_class in (('binomial', binomial_heap, binomial_heap.BinomialHeap),
+                                     ('fibonacci', fibonacci_heap, fibonacci_heap.FibonacciHeap)):
+        def inserted():
+            nodes = [module.Node(k) for k in keys]
+            h = heap_class()
+            for x in nodes:
+                h.insert(x)
+            return nodes
+        size = traced_bytes(inserted)[0]
+        nodes = [module.Node(k) for k in keys]
+        h = heap_class()
+        t = time.time()
+        for x in nodes:
+            h.insert(x)
+        t_insert = time.time() - t
+        t = time.time()
+        for _ in range(n):
+            h.extract_min()
+        t_extract = time.time() - t
+        results[name] = {'bytes_per_element': float(size) / n,
+                         'insert_ops': n / t_insert,
+                         'extract_ops': n / t_extract}
+    return results
+
+
+def bench_batch_decrease(n, seed=0):
+    """
+    n decrease_key calls on a FibonacciHeap of n nodes, one by one and through decrease_keys
+    :param n: int, number of nodes
+    :param seed: int, random seed
+    :return: dict, results per mode
+    """
+    results = {}
+    for mode in ('single', 'batch'):
+        rng = random.Random(seed)
+        nodes = [fibonacci_heap.Node(rng.randint(n, n * 10)) for _ in range(n)]
+        h = fibonacci_heap.FibonacciHeap.from_nodes(nodes)
+        keys = [x.key - rng.randint(0, n) for x in nodes]
+        t = time.time()
+        if mode == 'single':
+            for x, k in zip(nodes, keys):
+                h.decrease_key(x, k)
+        else:
+            h.decrease_keys(nodes, keys)
+        t = time.time() - t
+        results[mode] = {'ops': n / t}
+    return results
+
+
+def bench_union_all(n, seed=0):
+    """
+    merge 64 heaps holding n keys in total, with sequential union calls and with one union_all
+    :param n: int, total number of keys
+    :param seed: int, random seed
+    :return: dict, results per heap and mode
+    """
+    rng = random.Random(seed)
+    keys = [rng.randint(0, n * 10) for _ in range(n)]
+    shards = [keys[i::64] for i in range(64)]
+    results = {}
+    for name, heap_class in (('binomial', binomial_heap.BinomialHeap),
+                             ('fibonacci', fibonacci_heap.FibonacciHeap)):
+        for mode in ('union', 'union_all'):
+            heaps = [heap_class.from_iterable(shard) for shard in shards]
+            h = heaps[0]
+            t = time.time()
+            if mode == 'union':
+                for h1 in heaps[1:]:
+                    h.union(h1)
+            else:
+                h.union_all(heaps[1:])
+            t = time.time() - t
+            results[name + '/' + mode] = {'ms': t * 1000}
+    return results
+
+
+def bench_multiqueue(n, seed=0):
+    """
+    push/pop throughput of MultiQueue with 1 to 8 producer threads and as many consumer threads
+    :param n: int, total number of keys pushed and popped
+    :param seed: int, random seed
+    :return: dict, results per thread count
+    """
+    results = {}
+    for threads in (1, 2, 4, 8):
+        q = MultiQueue(shards=2 * threads, seed=seed)
+        rng = random.Random(seed)
+        keys = [rng.randint(0, n * 10) for _ in range(n)]
+        per_thread = n // threads
+
+        def produce(i):
+            for k in keys[i * per_thread:(i + 1) * per_thread]:
+                q.push(k)
+
+        def consume():
+            got = 0
+            while got < per_thread:
+                try:
+                    q.pop()
+                    got += 1
+                except Empty:
+                    time.sleep(0)
+
+        workers = [threading.Thread(target=produce, args=(i,)) for i in range(threads)]
+        workers += [threading.Thread(target=consume) for _ in range(threads)]
+        t = time.time()
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        t = time.time() - t
+        results['%d+%d threads' % (threads, threads)] = {'ops': 2 * per_thread * threads / t}
+    return results
+
+
+def bench_async(n, seed=0):
+    """
+    put-to-get latency of AsyncPriorityQueue and asyncio.PriorityQueue on the same workload,
+    see async_queue.latency_workload. needs Python 3
+    :param n: int, number of keys
+    :param seed: int, random seed
+    :return: dict, results per queue
+    """
+    import asyncio
+    from async_queue import AsyncPriorityQueue, latency_workload
+    rng = random.Random(seed)
+    keys = [rng.randint(0, n * 10) for _ in range(n)]
+    return {
+        'AsyncPriorityQueue': asyncio.run(latency_workload(
+            AsyncPriorityQueue(), lambda q, k, i: q.put_nowait(k, i), keys)),
+        'asyncio.PriorityQueue': asyncio.run(latency_workload(
+            asyncio.PriorityQueue(), lambda q, k, i: q.put_nowait((k, i)), keys)),
+    }
+
+
+def bench_graph(n, seed=0):
+    """
+    Dijkstra, early-exit Dijkstra and Prim with every graph engine, on random graphs with n vertices
+    and 4n edges, as used with n = 10^6
+    :param n: int, number of vertices
+    :param seed: int, random seed
+    :return: dict, results per engine
+    """
+    t = time.time()
+    g = graph.CSRGraph.random_graph(n, degree=4, seed=seed)
+    u = graph.CSRGraph.random_graph(n, degree=2, seed=seed, undirected=True)
+    build = time.time() - t
+    target = random.Random(seed).randrange(n)
+    results = {}
+    for engine in sorted(graph.GRAPH_ENGINES):
+        t = time.time()
+        graph.dijkstra(g, 0, engine=engine)
+        t_dijkstra = time.time() - t
+        t = time.time()
+        graph.dijkstra(g, 0, target=target, engine=engine)
+        t_target = time.time() - t
+        results[engine] = {'dijkstra_seconds': t_dijkstra,
+                           'target_seconds': t_target,
+                           'build_seconds': build}
+        if engine not in graph.MONOTONE_ENGINES:
+            t = time.time()
+            graph.prim(u, engine)
+            results[engine]['prim_seconds'] = time.time() - t
+    return results
+
+
+def bench_radix(n, seed=0):
+    """
+    integer-weight Dijkstra with RadixHeap and FibonacciHeap on random graphs with n vertices and 4n edges,
+    with small (1..16) and large (1..2^20) weights
+    :param n: int, number of vertices
+    :param seed: int, random seed
+    :return: dict, results per engine and weight range
+    """
+    results = {}
+    for max_weight in (16, 2 ** 20):
+        g = graph.CSRGraph.random_graph(n, degree=4, max_weight=max_weight, seed=seed)
+        dists = {}
+        for engine in ('fibonacci', 'radix'):
+            t = time.time()
+            dists[engine] = graph.dijkstra(g, 0, engine=engine)[0]
+            results['%s w<=%d' % (engine, max_weight)] = {'dijkstra_seconds': time.time() - t}
+        assert dists['fibonacci'] == dists['radix']
+    return results
+
+
+def bench_merge(n, seed=0):
+    """
+    values per second of merge.merge with every engine and of heapq.merge, on n sorted keys
+    split into 16 and 512 streams
+    :param n: int, total number of keys
+    :param seed: int, random seed
+    :return: dict, results per engine and number of streams
+    """
+    rng = random.Random(seed)
+    results = {}
+    for k in (16, 512):
+        streams = [sorted(rng.randint(0, n * 10) for _ in range(n // k)) for _ in range(k)]
+        runs = [('heapq', lambda: heapq.merge(*streams))]
+        for engine in sorted(priority_queue.ENGINES):
+            runs.append((engine, lambda engine=engine: merge.merge(*streams, engine=engine)))
+        for name, run in runs:
+            t = time.time()
+            for _ in run():
+                pass
+            results['%s k=%d' % (name, k)] = {'values_per_sec': k * (n // k) / (time.time() - t)}
+    return results
+
+
+def bench_heapsort(n, seed=0):
+    """
+    time to get the k smallest of n keys in order, for k = 10, n / 100 and n, with priority_queue.heapsort
+    on every engine, sorted() and heapq
+    :param n: int, number of keys
+    :param seed: int, random seed
+    :return: dict, results per method and k
+    """
+    rng = random.Random(seed)
+    keys = [rng.random() for _ in range(n)]
+
+    def heapq_pop(k):
+        h = list(keys)
+        heapq.heapify(h)
+        return [heapq.heappop(h) for _ in range(k)]
+
+    runs = [('sorted', lambda k: sorted(keys)[:k]),
+            ('heapq.nsmallest', lambda k: heapq.nsmallest(k, keys)),
+            ('heapq.heappop', heapq_pop)]
+    for engine in sorted(priority_queue.ENGINES):
+        runs.append((engine, lambda k, engine=engine: list(
+            itertools.islice(priority_queue.heapsort(keys, engine), k))))
+    results = {}
+    for name, run in runs:
+        for k in sorted(set((10, max(1, n // 100), n))):
+            t = time.time()
+            run(k)
+            results['%s k=%d' % (name, k)] = {'seconds': time.time() - t}
+    return results
+
+
+def bench_gc(n, seed=0):
+    """
+    sustained insert/extract_min churn on a FibonacciHeap of n nodes, with and without a NodePool
+    collection pauses are timed with gc.callbacks where the interpreter has them, otherwise
+    every operation slower than 1ms is counted as a pause
+    :param n: int, heap size and number of churn operations
+    :param seed: int, random seed
+    :return: dict, results per mode
+    """
+    rng = random.Random(seed)
+    keys = [rng.randint(0, n * 10) for _ in range(2 * n)]
+    results = {}
+    for mode in ('plain', 'pool'):
+        pool = fibonacci_heap.NodePool() if mode == 'pool' else None
+        h = fibonacci_heap.FibonacciHeap.from_iterable(keys[:n])
+        pauses = []
+        started = []
+
+        def on_gc(phase, info):
+            if phase == 'start':
+                started.append(time.time())
+            else:
+                pauses.append(time.time() - started.pop())
+
+        callbacks = getattr(gc, 'callbacks', None)
+        if callbacks is not None:
+            callbacks.append(on_gc)
+        gc.collect()
+        t = time.time()
+        for i in range(n):
+            t_op = time.time()
+            k = keys[n + i]
+            h.insert(pool.acquire(k) if pool else fibonacci_heap.Node(k))
+            x = h.extract_min()
+            if pool:
+                pool.release(x)
+            t_op = time.time() - t_op
+            if callbacks is None and t_op > 0.001:
+                pauses.append(t_op)
+        total = time.time() - t
+        if callbacks is not None:
+            callbacks.remove(on_gc)
+        results[mode] = {'ops': 2 * n / total,
+                         'gc_pauses': len(pauses),
+                         'gc_pause_max_ms': max(pauses or [0]) * 1000,
+                         'gc_pause_total_ms': sum(pauses) * 1000,
+                         'cyclic_garbage': gc.collect()}
+    return results
+
+
+def bench_fibonacci_ops(n, seed=0):
+    """
+    cost of FibonacciHeap.decrease_key and extract_min on a heap of n nodes
+    :param n: int, number of nodes
+    :param seed: int, random seed
+    :return: dict, results per operation
+    """
+    rng = random.Random(seed)
+    nodes = [fibonacci_heap.Node(rng.randint(n, n * 10)) for _ in range(n)]
+    h = fibonacci_heap.FibonacciHeap()
+    for x in nodes:
+        h.insert(x)
+    h.insert(fibonacci_heap.Node(-1))
+    # one extract_min turns the root list into trees, so decrease_key has something to cut
+    h.extract_min()
+    rng.shuffle(nodes)
+    half = nodes[:n // 2]
+    t = time.time()
+    for x in half:
+        h.decrease_key(x, x.key - rng.randint(0, n))
+    t_decrease = time.time() - t
+    t = time.time()
+    for _ in range(n // 2):
+        h.extract_min()
+    t_extract = time.time() - t
+    return {'decrease_key': {'us_per_op': t_decrease / len(half) * 1e6},
+            'extract_min': {'us_per_op': t_extract / (n // 2) * 1e6}}
+
+
+# engine name -> (heap class, node class)
+SUITE_ENGINES = {
+    'binomial': (binomial_heap.BinomialHeap, binomial_heap.Node),
+    'fibonacci': (fibonacci_heap.FibonacciHeap, fibonacci_heap.Node),
+    'heapq': (graph.HeapqHeap, graph.HeapqNode),
+    'pairing': (pairing_heap.PairingHeap, pairing_heap.Node),
+}
+
+
+def workload_insert(heap_class, node_class, keys, rng):
+    h = heap_class()
+    for k in keys:
+        h.insert(node_class(k))
+    return len(keys)
+
+
+def workload_extract(heap_class, node_class, keys, rng):
+    h = heap_class()
+    for k in keys:
+        h.insert(node_class(k))
+    for _ in keys:
+        h.extract_min()
+    return 2 * len(keys)
+
+
+def workload_decrease(heap_class, node_class, keys, rng):
+    """
+    Dijkstra-like: every extract_min is followed by up to 3 decrease_key calls on nodes still in the heap
+    """
+    h = heap_class()
+    # the payload of a node is its index, so extracted nodes are known whatever the engine's handles are
+    nodes = [h.insert(node_class(k, i)) for i, k in enumerate(keys)]
+    extracted = set()
+    ops = len(nodes)
+    for _ in keys:
+        z = h.extract_min()
+        extracted.add(z.payload)
+        ops += 1
+        for _ in range(3):
+            x = nodes[rng.randrange(len(nodes))]
+            if x.payload not in extracted and x.key > z.key:
+                h.decrease_key(x, rng.randint(z.key, x.key))
+                ops += 1
+    return ops
+
+
+def workload_union(heap_class, node_class, keys, rng):
+    """
+    build heaps of 64 keys and unite them one by one
+    """
+    heaps = []
+    for i in range(0, len(keys), 64):
+        h = heap_class()
+        for k in keys[i:i + 64]:
+            h.insert(node_class(k))
+        heaps.append(h)
+    h = heaps[0]
+    for h1 in heaps[1:]:
+        h.union(h1)
+    h.extract_min()
+    return len(keys) + len(heaps)
+
+
+def workload_mixed(heap_class, node_class, keys, rng):
+    """
+    50% insert, 30% extract_min, 20% decrease_key on a random node
+    """
+    h = heap_class()
+    nodes = []
+    extracted = set()
+    for k in keys:
+        r = rng.random()
+        if r < 0.5 or not nodes:
+            nodes.append(h.insert(node_class(k, len(nodes))))
+        elif r < 0.8:
+            z = h.extract_min()
+            if z is not None:
+                extracted.add(z.payload)
+        else:
+            x = nodes[rng.randrange(len(nodes))]
+            m = h.minimum()
+            if x.payload not in extracted and x.key > m.key:
+                h.decrease_key(x, rng.randint(m.key, x.key))
+    return len(keys)
+
+
+WORKLOADS = {
+    'insert': workload_insert,
+    'extract': workload_extract,
+    'decrease': workload_decrease,
+    'union': workload_union,
+    'mixed': workload_mixed,
+}
+
+
+def workload_run(workload, engine, n, seed):
+    """
+    :param workload: str, key of WORKLOADS
+    :param engine: str, key of SUITE_ENGINES
+    :param n: int, number of keys
+    :param seed: int, random seed
+    :return: function running the workload on the engine with the seeded keys, returns its op count
+    """
+    heap_class, node_class = SUITE_ENGINES[engine]
+    rng = random.Random(seed)
+    keys = [rng.randint(0, n * 10) for _ in range(n)]
+    return lambda: WORKLOADS[workload](heap_class, node_class, keys, rng)
+
+
+def peak_rss():
+    """
+    peak resident set size of this process, from VmHWM on Linux, which starts over at exec,
+    and from ru_maxrss otherwise, which can start at the size of the parent process
+    :return: int, bytes
+    """
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except IOError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def rss_growth(workload, engine, n, seed):
+    """
+    growth of the peak resident set size of this process while the workload runs, only meaningful
+    in a fresh process since the peak is kept for the lifetime of the process
+    :return: int, bytes
+    """
+    run = workload_run(workload, engine, n, seed)
+    before = peak_rss()
+    run()
+    return peak_rss() - before
+
+
+def peak_bytes(workload, engine, n, seed):
+    """
+    peak memory of a separate run of the workload, with tracemalloc when available, and otherwise
+    with the growth of the peak resident set size of a fresh interpreter
+    :return: int, bytes
+    """
+    if tracemalloc is not None:
+        run = workload_run(workload, engine, n, seed)
+        tracemalloc.start()
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return peak
+    code = 'import benchmark; print(benchmark.rss_growth(%r, %r, %d, %d))' % (workload, engine, n, seed)
+    out = subprocess.check_output([sys.executable, '-c', code],
+                                  cwd=os.path.dirname(os.path.abspath(__file__)))
+    return int(out)
+
+
+def bench_suite(n, seed=0):
+    """
+    every workload on every engine with the same seeded keys, timed without memory tracing,
+    and with the peak memory measured in a separate run
+    :param n: int, number of keys per workload
+    :param seed: int, random seed
+    :return: dict, 'workload/engine' -> {'ops_per_sec', 'peak_bytes'}
+    """
+    results = {}
+    for workload in sorted(WORKLOADS):
+        for engine in sorted(SUITE_ENGINES):
+            run = workload_run(workload, engine, n, seed)
+            t = time.time()
+            ops = run()
+            t = time.time() - t
+            del run
+            gc.collect()
+            results[workload + '/' + engine] = {'ops_per_sec': ops / t,
+                                                'peak_bytes': peak_bytes(workload, engine, n, seed)}
+            gc.collect()
+    return results
+
+
+def report(name, results):
+    """
+    print benchmark results
+    :param name: str, benchmark name
+    :param results: dict, engine -> metric -> value
+    """
+    print('%s:' % name)
+    for engine in sorted(results):
+        metrics = results[engine]
+        print('  %-20s' % engine + ''.join('  %s=%.4g' % (m, metrics[m]) for m in sorted(metrics)))
+
+
+BENCHMARKS = {
+    'array': bench_array_engine,
+    'async': bench_async,
+    'batch_decrease': bench_batch_decrease,
+    'fibonacci_ops': bench_fibonacci_ops,
+    'gc': bench_gc,
+    'graph': bench_graph,
+    'heapsort': bench_heapsort,
+    'incremental': bench_incremental,
+    'lazy': bench_lazy,
+    'merge': bench_merge,
+    'multiqueue': bench_multiqueue,
+    'nodes': bench_node_memory,
+    'radix': bench_radix,
+    'suite': bench_suite,
+    'union_all': bench_union_all,
+}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='heap benchmarks')
+    parser.add_argument('benchmark', choices=sorted(BENCHMARKS))
+    parser.add_argument('-n', type=int, nargs='+', default=[100000])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help='write the results as JSON to this file')
+    args = parser.parse_args()
+    runs = []
+    for n in args.n:
+        results = BENCHMARKS[args.benchmark](n, args.seed)
+        report('%s n=%d' % (args.benchmark, n), results)
+        runs.append({'n': n, 'results': results})
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'benchmark': args.benchmark, 'seed': args.seed, 'python': sys.version.split()[0],
+                       'runs': runs}, f, indent=2, sort_keys=True)
@@ -1,15 +1,43 @@
 import unittest
 import sys
-import copy
 
+import heap_iter
 
-class Node:
-    def __init__(self, key):
+
+class Handle(object):
+    """
+    stable reference to an element of a BinomialHeap, returned by insert
+    decrease_key and delete move elements between nodes, and re-point their handles
+    """
+    __slots__ = ('node',)
+
+    def __init__(self, node):
+        self.node = node
+
+    @property
+    def key(self):
+        return self.node.key
+
+    @property
+    def payload(self):
+        return self.node.payload
+
+
+class Node(object):
+    __slots__ = ('key', 'payload', 'p', 'child', 'sibling', 'degree', 'deleted', 'handle')
+
+    def __init__(self, key, payload=None):
         self.key = key
+        self.payload = payload
         self.p = None
         self.child = None
         self.sibling = None
         self.degree = 0
+        # tombstone set by delete in lazy-delete mode, it stays set once the node has left the heap
+        # so that deleting it again is a no-op, and is cleared when the node is inserted again
+        self.deleted = False
+        # Handle of the element held by this node, if insert gave one out
+        self.handle = None
 
     def __str__(self):
         s = 'key=' + str(self.key)
@@ -23,11 +51,51 @@ class Node:
         print the tree
         :param height: int, current height for drawing
         """
-        print '    ' * (height - 1) + '+----' * (height > 0) + self.__str__()
-        if self.child is not None:
-            self.child.draw(height + 1)
-        if self.sibling is not None:
-            self.sibling.draw(height)
+        self.dump(sys.stdout, height)
+
+    def iter_siblings(self):
+        """
+        self and the nodes after it in its sibling list, generated lazily
+        """
+        x = self
+        while x is not None:
+            yield x
+            x = x.sibling
+
+    def walk(self):
+        """
+        self, its sibling list and all their descendants in drawing order, generated without recursion
+        :return: iterator of (node, depth)
+        """
+        stack = [(self, 0)]
+        while stack:
+            x, depth = stack.pop()
+            yield x, depth
+            if x.sibling is not None:
+                stack.append((x.sibling, depth))
+            if x.child is not None:
+                stack.append((x.child, depth + 1))
+
+    def dump(self, f, height=0, fmt='text'):
+        """
+        write the trees walked from self to a file object, one line at a time
+        :param f: file object
+        :param height: int, height of self for text drawing
+        :param fmt: str, 'text' or 'dot' (Graphviz)
+        """
+        if fmt == 'dot':
+            f.write('digraph heap {\n')
+            for x, depth in self.walk():
+                f.write('  n%d [label="%s"];\n' % (id(x), x.key))
+                if x.p is not None:
+                    f.write('  n%d -> n%d;\n' % (id(x.p), id(x)))
+            f.write('}\n')
+        elif fmt == 'text':
+            for x, depth in self.walk():
+                height_x = height + depth
+                f.write('    ' * (height_x - 1) + '+----' * (height_x > 0) + x.__str__() + '\n')
+        else:
+            raise Exception('unknown dump format: ' + str(fmt))
 
     def reverse_child(self):
         """
@@ -58,31 +126,145 @@ def binomial_link(y, z):
     z.degree += 1
 
 
+def carry(trees, x):
+    """
+    add tree x to trees, a table of trees indexed by degree, linking equal-degree trees like a binary counter
+    :param trees: list[Node], trees[d] is the tree of degree d or None
+    :param x: root of the tree being added
+    :return: int, number of links done
+    """
+    d = x.degree
+    links = 0
+    while d < len(trees) and trees[d] is not None:
+        y = trees[d]
+        trees[d] = None
+        if y.key < x.key:
+            x, y = y, x
+        binomial_link(y, x)
+        links += 1
+        d += 1
+    while d >= len(trees):
+        trees.append(None)
+    trees[d] = x
+    return links
+
+
+def chain(trees):
+    """
+    chain the trees of a degree table into a root list sorted by degree
+    :param trees: list[Node], trees[d] is the tree of degree d or None
+    :return: (head, tail) of the root list
+    """
+    head = tail = None
+    for x in reversed(trees):
+        if x is not None:
+            x.sibling = head
+            head = x
+            if tail is None:
+                tail = x
+    return head, tail
+
+
 class BinomialHeap:
-    def __init__(self, head=None):
+    def __init__(self, head=None, lazy=False, lazy_delete=False, compact_threshold=0.5):
         self.head = head
+        tail = None
+        # number of nodes, a tree of degree k holds 2^k of them
+        self.n = 0
         if head is not None:
             p = head
             while p:
                 p.p = None
+                tail = p
+                self.n += 1 << p.degree
                 p = p.sibling
+        # in lazy mode insert and union only splice root lists, and trees of equal degree are
+        # linked when minimum or extract_min next runs
+        self.lazy = lazy
+        self.tail = tail if lazy else None
+        self.dirty = lazy and head is not None
+        # HeapStats collecting counters for this heap, if any
+        self.stats = None
+        # in lazy-delete mode delete only marks the node, marked nodes are removed when they reach
+        # the minimum or when the heap is compacted because more than compact_threshold of it is marked
+        self.lazy_delete = lazy_delete
+        self.compact_threshold = compact_threshold
+        self.tombstones = 0
+        # cached min root and the root before it, kept up to date by every operation
+        self.min = None
+        self.min_prev = None
+        self.update_min()
+
+    def update_min(self):
+        """
+        walk the root list and recompute self.min and self.min_prev
+        """
+        self.min = None
+        self.min_prev = None
+        prev_x = None
+        x = self.head
+        roots = 0
+        while x is not None:
+            if self.min is None or x.key < self.min.key:
+                self.min = x
+                self.min_prev = prev_x
+            prev_x = x
+            x = x.sibling
+            roots += 1
+        if self.stats is not None:
+            self.stats.root_list(roots)
 
     def minimum(self):
         """
         return the min node
         :return: node with min key
         """
+        if self.dirty:
+            self.consolidate()
+        while self.tombstones and self.min is not None and self.min.deleted:
+            self.tombstones -= 1
+            x = self.min
+            self.remove_root(x, self.min_prev)
+            if self.dirty:
+                self.consolidate()
+        return self.min
+
+    def consolidate(self):
+        """
+        link the roots of a lazy heap until there is only 1 tree for every degree
+        """
+        trees = []
+        links = 0
         x = self.head
-        y = x
-        if x is None:
-            return y
-        minimum = x.key
         while x is not None:
-            if x.key < minimum:
-                minimum = x.key
-                y = x
-            x = x.sibling
-        return y
+            next_x = x.sibling
+            x.sibling = None
+            links += carry(trees, x)
+            x = next_x
+        if self.stats is not None:
+            self.stats.consolidates += 1
+            self.stats.links += links
+        self.head, self.tail = chain(trees)
+        self.dirty = False
+        self.update_min()
+
+    def splice(self, h1):
+        """
+        put the root list of h1 in front of the root list of self in O(1), without linking any trees
+        :param h1: another heap
+        """
+        if h1.head is None:
+            return
+        tail = h1.tail if h1.lazy else None
+        if tail is None:
+            tail = h1.head
+            while tail.sibling is not None:
+                tail = tail.sibling
+        tail.sibling = self.head
+        if self.head is None:
+            self.tail = tail
+        self.head = h1.head
+        self.dirty = True
 
     def merge(self, h1):
         """
@@ -124,12 +306,21 @@ class BinomialHeap:
         unites self and h1
         :param h1: another heap that will union with this heap
         """
+        self.n += h1.n
+        self.tombstones += h1.tombstones
+        if self.lazy:
+            self.splice(h1)
+            return
+        if h1.dirty:
+            h1.consolidate()
         self.head = self.merge(h1)
         if self.head is None:
+            self.update_min()
             return
         prev_x = None
         x = self.head
         next_x = x.sibling
+        links = 0
         while next_x is not None:
             if x.degree != next_x.degree or \
                     (next_x.sibling is not None and next_x.sibling.degree == x.degree):
@@ -139,23 +330,77 @@ class BinomialHeap:
                 if x.key <= next_x.key:
                     x.sibling = next_x.sibling
                     binomial_link(next_x, x)
+                    links += 1
                 else:
                     if prev_x is None:
                         self.head = next_x
                     else:
                         prev_x.sibling = next_x
                     binomial_link(x, next_x)
+                    links += 1
                     x = next_x
             next_x = x.sibling
-        return
+        if self.stats is not None:
+            self.stats.links += links
+        self.update_min()
+
+    def union_all(self, heaps):
+        """
+        unites self with every heap in heaps, bucketing all roots by degree and carrying once
+        the other heaps are left empty
+        :param heaps: iterable of BinomialHeap
+        """
+        heaps = list(heaps)
+        for h in heaps:
+            self.n += h.n
+            self.tombstones += h.tombstones
+        if self.lazy:
+            for h in heaps:
+                self.splice(h)
+                h.head = h.tail = None
+                h.n = h.tombstones = 0
+                h.update_min()
+            return
+        trees = []
+        links = 0
+        for h in [self] + heaps:
+            x = h.head
+            while x is not None:
+                next_x = x.sibling
+                x.sibling = None
+                x.p = None
+                links += carry(trees, x)
+                x = next_x
+            if h is not self:
+                h.head = h.tail = None
+                h.n = h.tombstones = 0
+                h.dirty = False
+                h.update_min()
+        if self.stats is not None:
+            self.stats.links += links
+        self.head = chain(trees)[0]
+        self.update_min()
 
     def insert(self, x):
         """
         insert node x into binomial heap h
         :param x: node that will be inserted
+        :return: Handle, stays on x's element while it is in the heap
         """
-        h1 = BinomialHeap(x)
-        return self.union(h1)
+        if x.handle is None:
+            x.handle = Handle(x)
+        x.deleted = False
+        if self.lazy:
+            x.p = None
+            x.sibling = self.head
+            if self.head is None:
+                self.tail = x
+            self.head = x
+            self.dirty = True
+            self.n += 1
+        else:
+            self.union(BinomialHeap(x))
+        return x.handle
 
     def extract_min(self):
         """
@@ -163,32 +408,78 @@ class BinomialHeap:
         :return: node with minimum key
         """
         x = self.minimum()
+        if x is None:
+            return None
+        self.remove_root(x, self.min_prev)
+        return x
 
-        # remove x from the root list of h
-        p = self.head
-        prev_p = None
-        while p is not x:
-            if prev_p is None:
-                prev_p = p
-            else:
-                prev_p = prev_p.sibling
-            p = p.sibling
-        prev_p.sibling = p.sibling
+    def remove_root(self, x, prev_x):
+        """
+        remove root x from the root list and union its children back in
+        :param x: root node
+        :param prev_x: root before x in the root list, None if x is the head
+        """
+        if prev_x is None:
+            self.head = x.sibling
+        else:
+            prev_x.sibling = x.sibling
+        if x is self.tail:
+            self.tail = prev_x
+        self.dirty = self.lazy
 
         # reverse the order of the linked list of x's children
         x.reverse_child()
 
         h1 = BinomialHeap(x.child)
+        # x's children are already counted
+        self.n -= h1.n + 1
         self.union(h1)
-        return x
 
     def delete(self, x):
         """
-        delete node x from heap
-        :param x: node that will be deleted
+        delete an element from heap, in lazy-delete mode deleting an element that was already deleted
+        does nothing
+        :param x: Handle returned by insert, or Node whose current element is deleted
+        """
+        if isinstance(x, Handle):
+            x = x.node
+        if self.lazy_delete:
+            if not x.deleted:
+                x.deleted = True
+                self.tombstones += 1
+                if self.tombstones > self.compact_threshold * self.n:
+                    self.compact()
+            return
+        while x.p is not None:
+            self.swap_with_parent(x)
+            x = x.p
+        prev_x = None
+        p = self.head
+        while p is not x:
+            prev_x = p
+            p = p.sibling
+        self.remove_root(x, prev_x)
+
+    def compact(self):
+        """
+        rebuild the heap from its unmarked nodes in O(n), dropping every tombstone
         """
-        self.decrease_key(x, -sys.maxint)
-        self.extract_min()
+        live = []
+        if self.head is not None:
+            for x, _ in self.head.walk():
+                if not x.deleted:
+                    live.append(x)
+        h = BinomialHeap.from_nodes(live)
+        self.head = h.head
+        self.n = h.n
+        self.tombstones = 0
+        self.dirty = False
+        self.tail = None
+        if self.lazy and self.head is not None:
+            self.tail = self.head
+            while self.tail.sibling is not None:
+                self.tail = self.tail.sibling
+        self.update_min()
 
     def draw(self):
         """
@@ -196,6 +487,33 @@ class BinomialHeap:
         """
         self.head.draw()
 
+    def nsmallest(self, k):
+        """
+        the k smallest keys in increasing order, without changing the heap, see heap_iter.nsmallest
+        :param k: int
+        :return: list of keys
+        """
+        return heap_iter.nsmallest(self.head.iter_siblings() if self.head is not None else (), k)
+
+    def drain(self, payloads=False):
+        """
+        extract every node in increasing key order, see heap_iter.drain
+        :param payloads: bool, yield payloads instead of keys
+        :return: generator of keys or payloads
+        """
+        return heap_iter.drain(self, payloads)
+
+    def dump(self, f, fmt='text'):
+        """
+        write the structure of the heap to a file object, one line at a time
+        :param f: file object
+        :param fmt: str, 'text' or 'dot' (Graphviz)
+        """
+        if self.head is not None:
+            self.head.dump(f, fmt=fmt)
+        elif fmt == 'dot':
+            f.write('digraph heap {\n}\n')
+
     @staticmethod
     def make_heap():
         """
@@ -204,23 +522,65 @@ class BinomialHeap:
         """
         return BinomialHeap()
 
-    @staticmethod
-    def decrease_key(x, k):
+    @classmethod
+    def from_nodes(cls, nodes):
+        """
+        build a heap from unlinked nodes in O(n), pairing equal-degree trees like a binary counter
+        :param nodes: iterable of Node, their links are reset
+        :return: new heap
+        """
+        trees = []
+        for x in nodes:
+            x.p = x.child = x.sibling = None
+            x.degree = 0
+            carry(trees, x)
+        head = chain(trees)[0]
+        return cls(head)
+
+    @classmethod
+    def from_iterable(cls, keys):
+        """
+        build a heap holding keys in O(n)
+        :param keys: iterable of keys
+        :return: new heap
+        """
+        return cls.from_nodes(Node(k) for k in keys)
+
+    def swap_with_parent(self, y):
         """
-        decrease x.key to k, k should be smaller than x.key
-        :param x: node that will have k decreased
-        :param k: new key for node x
-        :raise : exception when k > x.key
+        exchange the elements of node y and its parent in O(1), re-pointing their handles
+        :param y: node with a parent
         """
+        z = y.p
+        if self.stats is not None:
+            self.stats.swaps += 1
+        y.key, z.key = z.key, y.key
+        y.payload, z.payload = z.payload, y.payload
+        y.deleted, z.deleted = z.deleted, y.deleted
+        y.handle, z.handle = z.handle, y.handle
+        if y.handle is not None:
+            y.handle.node = y
+        if z.handle is not None:
+            z.handle.node = z
+
+    def decrease_key(self, x, k):
+        """
+        decrease the key of an element to k, k should be smaller than its key
+        the element moves up by O(log n) swaps with its parent, its handle follows it
+        :param x: Handle returned by insert, or Node whose current element is decreased
+        :param k: new key for the element
+        :raise : exception when k > current key
+        """
+        if isinstance(x, Handle):
+            x = x.node
         if k > x.key:
             raise Exception('new key is greater than current key')
         x.key = k
-        y = x
-        z = x.p
-        while z is not None and y.key < z.key:
-            y.key, z.key = z.key, y.key
-            y = z
-            z = y.p
+        while x.p is not None and x.key < x.p.key:
+            self.swap_with_parent(x)
+            x = x.p
+        if x.p is None and not self.dirty and x.key < self.min.key:
+            self.update_min()
 
 
 class TestHeapMethods(unittest.TestCase):
@@ -437,6 +797,251 @@ class TestHeapMethods(unittest.TestCase):
         self.assertTrue(h1.head.child.child is None)
         self.assertTrue(h1.head.child.sibling is None)
 
+    def assert_min_cached(self, h):
+        x = h.head
+        prev_x = None
+        y = None
+        prev_y = None
+        while x is not None:
+            if y is None or x.key < y.key:
+                y = x
+                prev_y = prev_x
+            prev_x = x
+            x = x.sibling
+        self.assertTrue(h.minimum() is y)
+        self.assertTrue(h.min_prev is prev_y)
+
+    def test_cached_min(self):
+        h = BinomialHeap()
+        self.assert_min_cached(h)
+        nodes = [Node(k) for k in [12, 7, 25, 15, 33, 28, 41, 18, 3, 37, 1, 50]]
+        for x in nodes:
+            h.insert(x)
+            self.assert_min_cached(h)
+        h2 = BinomialHeap()
+        h2.insert(Node(0))
+        h2.insert(Node(60))
+        h.union(h2)
+        self.assert_min_cached(h)
+        self.assertEqual(h.minimum().key, 0)
+        h.decrease_key(nodes[6], -1)
+        self.assert_min_cached(h)
+        self.assertEqual(h.minimum().key, -1)
+        keys = []
+        while h.minimum() is not None:
+            keys.append(h.extract_min().key)
+            self.assert_min_cached(h)
+        self.assertEqual(keys, sorted(keys))
+        self.assertEqual(len(keys), 14)
+        self.assertTrue(h.extract_min() is None)
+
+    def test_from_iterable(self):
+        keys = [12, 7, 25, 15, 33, 28, 41, 18, 3, 37, 1]
+        h = BinomialHeap.from_iterable(keys)
+        self.assert_min_cached(h)
+        degrees = []
+        x = h.head
+        while x is not None:
+            degrees.append(x.degree)
+            x = x.sibling
+        # 11 = 0b1011
+        self.assertEqual(degrees, [0, 1, 3])
+        self.assertEqual([h.extract_min().key for _ in keys], sorted(keys))
+        self.assertTrue(BinomialHeap.from_iterable([]).minimum() is None)
+
+    def test_lazy(self):
+        keys = [12, 7, 25, 15, 33, 28, 41, 18, 3, 37, 1, 50]
+        nodes = [Node(k) for k in keys]
+        h = BinomialHeap(lazy=True)
+        for x in nodes:
+            h.insert(x)
+        self.assertTrue(h.dirty)
+        self.assertTrue(all(x.degree == 0 for x in nodes))
+        self.assertTrue(h.tail is nodes[0])
+        self.assertEqual(h.minimum().key, 1)
+        self.assertFalse(h.dirty)
+        self.assert_min_cached(h)
+        h2 = BinomialHeap()
+        h2.insert(Node(2))
+        h2.insert(Node(60))
+        h.union(h2)
+        self.assertTrue(h.dirty)
+        h.decrease_key(nodes[6], 0)
+        self.assertEqual(h.extract_min().key, 0)
+        h.insert(Node(5))
+        out = [h.extract_min().key for _ in range(14)]
+        self.assertEqual(out, sorted(keys[:6] + keys[7:] + [2, 60, 5]))
+        self.assertTrue(h.extract_min() is None)
+        # an eager heap consolidates a lazy one before merging with it
+        h3 = BinomialHeap(lazy=True)
+        for k in [9, 8, 7]:
+            h3.insert(Node(k))
+        h4 = BinomialHeap.from_iterable([4, 6])
+        h4.union(h3)
+        self.assert_min_cached(h4)
+        self.assertEqual([h4.extract_min().key for _ in range(5)], [4, 6, 7, 8, 9])
+
+    def test_stable_handles(self):
+        keys = [12, 7, 25, 15, 33, 28, 41, 18, 3, 37, 1, 50, 9, 44, 21, 30]
+        for lazy in (False, True):
+            h = BinomialHeap(lazy=lazy)
+            nodes = [h.insert(Node(k)) for k in keys]
+            h.minimum()
+            expected = dict((x, x.key) for x in nodes)
+            for i, k in ((6, 0), (15, -5), (3, 2), (13, 8)):
+                h.decrease_key(nodes[i], k)
+                expected[nodes[i]] = k
+                self.assertEqual(nodes[i].key, k)
+                self.assert_min_cached(h)
+            for x in (nodes[0], nodes[10], nodes[6]):
+                h.delete(x)
+                del expected[x]
+            self.assertEqual(set(x.key for x in expected), set(expected.values()))
+            out = []
+            while h.minimum() is not None:
+                x = h.extract_min()
+                self.assertTrue(x.handle.node is x)
+                self.assertEqual(x.key, expected.pop(x.handle))
+                out.append(x.key)
+            self.assertEqual(out, sorted(out))
+            self.assertEqual(expected, {})
+
+    def test_dump(self):
+        try:
+            from StringIO import StringIO
+        except ImportError:
+            from io import StringIO
+        # a lazy heap keeps one long root list, deeper than the recursion limit
+        n = sys.getrecursionlimit() + 100
+        h = BinomialHeap(lazy=True)
+        for k in range(n):
+            h.insert(Node(k))
+        f = StringIO()
+        h.dump(f)
+        self.assertEqual(len(f.getvalue().splitlines()), n)
+        h.minimum()
+        f = StringIO()
+        h.dump(f)
+        lines = f.getvalue().splitlines()
+        self.assertEqual(len(lines), n)
+        self.assertTrue(lines[0].startswith('key='))
+        self.assertTrue(lines[1].startswith('+----key='))
+        f = StringIO()
+        h.dump(f, fmt='dot')
+        lines = f.getvalue().splitlines()
+        self.assertEqual(lines[0], 'digraph heap {')
+        self.assertEqual(lines[-1], '}')
+        self.assertEqual(len([l for l in lines if '->' in l]), n - len(list(h.head.iter_siblings())))
+        self.assertEqual(sorted(x.key for x, _ in h.head.walk()), list(range(n)))
+        self.assertRaises(Exception, h.dump, f, 'svg')
+
+    def test_nsmallest(self):
+        import random
+        rng = random.Random(3)
+        keys = [rng.randint(0, 100) for _ in range(200)]
+        h = BinomialHeap.from_iterable(keys)
+        for k in (0, 1, 10, 200, 300):
+            self.assertEqual(h.nsmallest(k), sorted(keys)[:k])
+        h.extract_min()
+        self.assertEqual(h.nsmallest(5), sorted(keys)[1:6])
+        self.assertEqual(len(list(h.head.walk())), 199)
+        self.assertEqual(BinomialHeap().nsmallest(3), [])
+
+    def test_drain(self):
+        import random
+        rng = random.Random(4)
+        keys = [rng.randint(0, 100) for _ in range(200)]
+        self.assertEqual(list(BinomialHeap.from_iterable(keys).drain()), sorted(keys))
+        h = BinomialHeap.from_iterable(keys)
+        for i, k in enumerate(h.drain()):
+            if i == 9:
+                break
+        # the abandoned generator leaves the other keys in the heap
+        self.assertEqual(h.n, 190)
+        self.assertEqual(h.nsmallest(3), sorted(keys)[10:13])
+        self.assertEqual(len(list(h.head.walk())), 190)
+        h = BinomialHeap()
+        for k in (3, 1, 2):
+            h.insert(Node(k, str(k)))
+        self.assertEqual(list(h.drain(payloads=True)), ['1', '2', '3'])
+        self.assertEqual(list(h.drain()), [])
+
+    def test_union_all(self):
+        import random
+        rng = random.Random(7)
+        for lazy in (False, True):
+            heaps = []
+            keys = []
+            for i in range(10):
+                ks = [rng.randint(0, 1000) for _ in range(rng.randint(0, 40))]
+                keys += ks
+                heaps.append(BinomialHeap.from_iterable(ks))
+            heaps[3].lazy = True
+            h = BinomialHeap(lazy=lazy)
+            h.insert(Node(500))
+            keys.append(500)
+            h.union_all(heaps)
+            self.assertTrue(all(h1.minimum() is None for h1 in heaps))
+            if not lazy:
+                degrees = [x.degree for x in h.head.iter_siblings()]
+                self.assertEqual(degrees, sorted(set(degrees)))
+                self.assert_min_cached(h)
+            self.assertEqual([h.extract_min().key for _ in keys], sorted(keys))
+
+    def test_lazy_delete(self):
+        import random
+        rng = random.Random(11)
+        for lazy in (False, True):
+            h = BinomialHeap(lazy=lazy, lazy_delete=True, compact_threshold=0.5)
+            nodes = [Node(rng.random()) for _ in range(200)]
+            for x in nodes:
+                h.insert(x)
+            self.assertEqual(h.n, 200)
+            cancelled = set(rng.sample(range(200), 90))
+            for i in cancelled:
+                h.delete(nodes[i])
+            self.assertEqual(h.tombstones, 90)
+            self.assertEqual(h.n, 200)
+            live = sorted(nodes[i].key for i in range(200) if i not in cancelled)
+            self.assertEqual(h.nsmallest(5), live[:5])
+            self.assertEqual(h.minimum().key, live[0])
+            # passing the threshold compacts the heap
+            more = [i for i in range(200) if i not in cancelled][-20:]
+            for i in more:
+                h.delete(nodes[i])
+                cancelled.add(i)
+            self.assertTrue(h.tombstones < 50)
+            self.assertEqual(h.n - h.tombstones, 200 - len(cancelled))
+            live = sorted(nodes[i].key for i in range(200) if i not in cancelled)
+            out = []
+            while h.minimum() is not None:
+                out.append(h.extract_min().key)
+            self.assertEqual(out, live)
+            self.assertEqual(h.n, 0)
+            self.assertEqual(h.tombstones, 0)
+
+    def test_lazy_delete_twice(self):
+        # an entry may be cancelled again after compact or minimum has dropped it from the heap
+        for cancelled in (6, 1):
+            h = BinomialHeap(lazy_delete=True, compact_threshold=0.5)
+            handles = [h.insert(Node(k)) for k in range(10)]
+            for x in handles[:cancelled]:
+                h.delete(x)
+            self.assertEqual(h.minimum().key, cancelled)
+            for x in handles[:cancelled]:
+                h.delete(x)
+            self.assertEqual((h.n, h.tombstones), (10 - cancelled, 0))
+            self.assertEqual([h.extract_min().key for _ in range(h.n)], list(range(cancelled, 10)))
+
+    def test_delete_non_integer_keys(self):
+        h = BinomialHeap()
+        nodes = [Node(k) for k in ['m', 'c', 'x', 'a', 'q', 'f', 'z']]
+        for x in nodes:
+            h.insert(x)
+        h.delete(nodes[1])
+        self.assertEqual(h.n, 6)
+        self.assertEqual([h.extract_min().key for _ in range(6)], ['a', 'f', 'm', 'q', 'x', 'z'])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,17 +1,24 @@
 import unittest
-import math
 import sys
 
+import heap_iter
 
-class Node:
-    def __init__(self, key):
+
+class Node(object):
+    __slots__ = ('key', 'payload', 'p', 'child', 'left', 'right', 'mark', 'degree', 'deleted')
+
+    def __init__(self, key, payload=None):
         self.key = key
+        self.payload = payload
         self.p = None
         self.child = None
         self.left = self
         self.right = self
         self.mark = False
         self.degree = 0
+        # tombstone set by delete in lazy-delete mode, it stays set once the node has left the heap
+        # so that deleting it again is a no-op, and is cleared when the node is inserted again
+        self.deleted = False
 
     def __str__(self):
         s = 'key:' + str(self.key)
@@ -27,10 +34,44 @@ class Node:
         print the tree
         :param height: int, current height for drawing
         """
-        for x in self.siblings():
-            print '    ' * (height-1) + '+----' * (height > 0) + x.__str__()
+        self.dump(sys.stdout, height)
+
+    def walk(self):
+        """
+        self, its siblings and all their descendants in drawing order, generated without recursion
+        :return: iterator of (Node, depth)
+        """
+        stack = [(self.iter_siblings(), 0)]
+        while stack:
+            it, depth = stack[-1]
+            x = next(it, None)
+            if x is None:
+                stack.pop()
+                continue
+            yield x, depth
             if x.child is not None:
-                x.child.draw(height+1)
+                stack.append((x.child.iter_siblings(), depth + 1))
+
+    def dump(self, f, height=0, fmt='text'):
+        """
+        write the trees walked from self to a file object, one line at a time
+        :param f: file object
+        :param height: int, height of self for text drawing
+        :param fmt: str, 'text' or 'dot' (Graphviz)
+        """
+        if fmt == 'dot':
+            f.write('digraph heap {\n')
+            for x, depth in self.walk():
+                f.write('  n%d [label="%s"];\n' % (id(x), x.key))
+                if depth > 0:
+                    f.write('  n%d -> n%d;\n' % (id(x.p), id(x)))
+            f.write('}\n')
+        elif fmt == 'text':
+            for x, depth in self.walk():
+                height_x = height + depth
+                f.write('    ' * (height_x - 1) + '+----' * (height_x > 0) + x.__str__() + '\n')
+        else:
+            raise Exception('unknown dump format: ' + str(fmt))
 
     def size(self):
         """
@@ -92,42 +133,183 @@ class Node:
         all children of self
         :return: list[Node], all children of self
         """
-        children = []
-        child = self.child
-        if child is None:
-            return children
-        children.append(child)
-        p = child.right
-        while p is not child:
-            children.append(p)
-            p = p.right
-        return children
+        return list(self.iter_children())
 
     def siblings(self):
         """
         all siblings of self
         :return: list[Node]
         """
-        siblings = []
-        siblings.append(self)
+        return list(self.iter_siblings())
+
+    def iter_children(self):
+        """
+        children of self, generated lazily
+        """
+        if self.child is not None:
+            for x in self.child.iter_siblings():
+                yield x
+
+    def iter_siblings(self):
+        """
+        self and its siblings around the ring, generated lazily
+        the ring must not be changed while it is being iterated
+        """
+        yield self
         p = self.right
         while p is not self:
-            siblings.append(p)
+            yield p
             p = p.right
-        return siblings
+
+
+class NodePool:
+    """
+    free list of extracted nodes, so that a high-churn workload reuses nodes instead of allocating them
+    """
+    def __init__(self, capacity=1024):
+        self.capacity = capacity
+        self.free = []
+
+    def acquire(self, key, payload=None):
+        """
+        a node with the given key, recycled from the free list when possible
+        :param key: key of the node
+        :param payload: payload of the node
+        :return: Node
+        """
+        if not self.free:
+            return Node(key, payload)
+        x = self.free.pop()
+        x.key = key
+        x.payload = payload
+        x.left = x.right = x
+        return x
+
+    def release(self, x):
+        """
+        give back a node that has been extracted from its heap and is no longer referenced
+        :param x: Node
+        """
+        if len(self.free) < self.capacity:
+            x.payload = None
+            x.p = x.child = x.left = x.right = None
+            x.mark = False
+            x.degree = 0
+            self.free.append(x)
 
 
 class FibonacciHeap:
-    def __init__(self, head=None):
+    def __init__(self, head=None, consolidate_budget=None, lazy_delete=False, compact_threshold=0.5):
         self.min = head
         self.n = 0 if self.min is None else 1
+        # degree table reused by every consolidate, entries are cleared after each pass
+        self.degrees = []
+        # with a budget, insert, extract_min and every root added by a cut consolidate at most that
+        # many roots, and self.degrees keeps the already consolidated roots between operations
+        self.consolidate_budget = consolidate_budget
+        # next root the incremental consolidation looks at
+        self.cursor = None
+        # HeapStats collecting counters for this heap, if any
+        self.stats = None
+        # in lazy-delete mode delete only marks the node, marked nodes are removed when they reach
+        # the minimum or when the heap is compacted because more than compact_threshold of it is marked
+        self.lazy_delete = lazy_delete
+        self.compact_threshold = compact_threshold
+        self.tombstones = 0
+
+    @classmethod
+    def from_nodes(cls, nodes):
+        """
+        build a heap from unlinked nodes in O(n), pre-linking them into trees of distinct degree
+        so that the first extract_min has no long root list to consolidate
+        :param nodes: iterable of Node, their links are reset
+        :return: FibonacciHeap
+        """
+        h = cls()
+        trees = []
+        for x in nodes:
+            x.p = x.child = None
+            x.left = x.right = x
+            x.mark = False
+            x.degree = 0
+            d = 0
+            while d < len(trees) and trees[d] is not None:
+                y = trees[d]
+                trees[d] = None
+                if y.key < x.key:
+                    x, y = y, x
+                h.link(y, x)
+                d += 1
+            if d == len(trees):
+                trees.append(x)
+            else:
+                trees[d] = x
+            h.n += 1
+        for x in trees:
+            if x is None:
+                continue
+            if h.min is None:
+                h.min = x
+            else:
+                h.min.insert(x)
+                if x.key < h.min.key:
+                    h.min = x
+        return h
+
+    @classmethod
+    def from_iterable(cls, keys):
+        """
+        build a heap holding keys in O(n)
+        :param keys: iterable of keys
+        :return: FibonacciHeap
+        """
+        return cls.from_nodes(Node(k) for k in keys)
+
+    def minimum(self):
+        """
+        return the min node
+        :return: Node, node with min key
+        """
+        if self.tombstones:
+            self.skip_tombstones()
+        return self.min
+
+    def nsmallest(self, k):
+        """
+        the k smallest keys in increasing order, without changing the heap, see heap_iter.nsmallest
+        :param k: int
+        :return: list of keys
+        """
+        return heap_iter.nsmallest(self.min.iter_siblings() if self.min is not None else (), k)
+
+    def drain(self, payloads=False):
+        """
+        extract every node in increasing key order, see heap_iter.drain
+        :param payloads: bool, yield payloads instead of keys
+        :return: generator of keys or payloads
+        """
+        return heap_iter.drain(self, payloads)
+
+    def dump(self, f, fmt='text'):
+        """
+        write the structure of the heap to a file object, one line at a time
+        :param f: file object
+        :param fmt: str, 'text' or 'dot' (Graphviz)
+        """
+        if self.min is not None:
+            self.min.dump(f, fmt=fmt)
+        elif fmt == 'dot':
+            f.write('digraph heap {\n}\n')
 
     def insert(self, x):
         """
         insert node x into root list, self.n += 1
         :param x: Node
+        :return: Node, x is its own handle
         """
+        x.deleted = False
         if self.min is None:
+            x.left = x.right = x
             self.min = x
         else:
             # x.left = self.min
@@ -138,12 +320,16 @@ class FibonacciHeap:
             if x.key < self.min.key:
                 self.min = x
         self.n += 1
+        if self.consolidate_budget is not None:
+            self.consolidate_step()
+        return x
 
     def union(self, h2):
         """
         unites self and h2
         :param h2: FibonacciHeap, another heap that will be united with self
         """
+        self.tombstones += h2.tombstones
         if self.min is None:
             self.min = h2.min
             self.n = h2.n
@@ -153,54 +339,183 @@ class FibonacciHeap:
                 self.min = h2.min
             self.n += h2.n
 
+    def union_all(self, heaps):
+        """
+        unites self with every heap in heaps by splicing their root rings, with one min update
+        the other heaps are left empty
+        :param heaps: iterable of FibonacciHeap
+        """
+        best = self.min
+        for h in heaps:
+            if h.min is None:
+                continue
+            if self.min is None:
+                self.min = h.min
+            else:
+                self.min.concatenate(h.min)
+            if best is None or h.min.key < best.key:
+                best = h.min
+            self.n += h.n
+            self.tombstones += h.tombstones
+            h.min = h.cursor = None
+            h.n = h.tombstones = 0
+            del h.degrees[:]
+        self.min = best
+
     def extract_min(self):
         """
         extract the node with minimum key, and reshape the heap
         :return: Node, node with minimum key
         """
+        if self.tombstones:
+            self.skip_tombstones()
+        return self.remove_min()
+
+    def skip_tombstones(self):
+        """
+        remove marked nodes from the top of the heap until the min is unmarked
+        """
+        while self.min is not None and self.min.deleted:
+            self.tombstones -= 1
+            self.remove_min()
+
+    def remove_min(self):
+        """
+        extract self.min, whether it is marked or not
+        :return: Node, self.min
+        """
         z = self.min
         if z is not None:
             # for x in z.children():
             #     x.p = None
             #     z.insert(x)
+            incremental = self.consolidate_budget is not None
+            if incremental:
+                self.untable(z)
+                # the promoted children add to the work of this step, so the root list stays short
+                steps = self.consolidate_budget + z.degree
+                for x in z.iter_children():
+                    x.p = None
             z.concatenate(z.child)
             z.left.right = z.right
             z.right.left = z.left
             if z is z.right:
                 self.min = None
+                self.cursor = None
+            elif incremental:
+                if self.cursor is z:
+                    self.cursor = z.right
+                self.min = z.right
+                self.consolidate_step(steps)
+                self.update_min()
             else:
                 self.min = z.right
                 self.consolidate()
             self.n -= 1
+            # drop every link out of z so that it is not part of any reference cycle,
+            # and is freed by reference counting once the caller lets go of it
+            z.child = z.left = z.right = None
+            z.degree = 0
         return z
 
     def consolidate(self):
         """
         reshape the heap such that there is only 1 tree for every degree
         """
-        a = [None for _ in range(self.max_degree())]
-        for w in self.min.siblings():
+        a = self.degrees
+        # break the root ring into a chain and walk it in place
+        w = self.min
+        w.left.right = None
+        roots = 0
+        while w is not None:
+            roots += 1
+            next_w = w.right
+            # children of the extracted node still point to it
+            w.p = None
+            w.left = w.right = w
             x = w
             d = x.degree
-            while a[d] is not None:
+            while d < len(a) and a[d] is not None:
                 y = a[d]
                 if x.key > y.key:
                     x, y = y, x
                 self.link(y, x)
                 a[d] = None
                 d += 1
+            while d >= len(a):
+                a.append(None)
             a[d] = x
+            w = next_w
+        if self.stats is not None:
+            self.stats.consolidates += 1
+            self.stats.root_list(roots)
         self.min = None
-        for i in range(len(a)):
-            if a[i] is not None:
+        for i, x in enumerate(a):
+            if x is not None:
+                a[i] = None
                 if self.min is None:
-                    self.min = a[i]
-                    self.min.left = self.min
-                    self.min.right = self.min
+                    self.min = x
                 else:
-                    self.min.insert(a[i])
-                    if a[i].key < self.min.key:
-                        self.min = a[i]
+                    self.min.insert(x)
+                    if x.key < self.min.key:
+                        self.min = x
+
+    def consolidate_step(self, steps=None):
+        """
+        move the cursor over a few roots, linking each root that is not in the degree table with
+        the table's roots of equal degree
+        :param steps: int, number of roots to look at, consolidate_budget by default
+        """
+        a = self.degrees
+        c = self.cursor if self.cursor is not None else self.min
+        for _ in range(steps or self.consolidate_budget):
+            next_c = c.right
+            d = c.degree
+            if d < len(a) and a[d] is c:
+                c = next_c
+                continue
+            x = c
+            while d < len(a) and a[d] is not None:
+                y = a[d]
+                a[d] = None
+                if x.key > y.key:
+                    x, y = y, x
+                self.link(y, x)
+                d += 1
+            while d >= len(a):
+                a.append(None)
+            a[d] = x
+            # next_c may just have been linked below x
+            c = next_c if next_c.p is None else x.right
+        self.cursor = c
+        # a root with a key equal to the min may have become the min's parent
+        while self.min.p is not None:
+            self.min = self.min.p
+
+    def untable(self, x):
+        """
+        forget root x in the degree table, before it stops being a root or its degree changes
+        :param x: Node, a root
+        """
+        d = x.degree
+        if d < len(self.degrees) and self.degrees[d] is x:
+            self.degrees[d] = None
+
+    def update_min(self):
+        """
+        walk the root list and point self.min at the root with the minimum key
+        """
+        m = x = self.min
+        roots = 1
+        x = x.right
+        while x is not self.min:
+            if x.key < m.key:
+                m = x
+            x = x.right
+            roots += 1
+        self.min = m
+        if self.stats is not None:
+            self.stats.root_list(roots)
 
     def link(self, y, x):
         """
@@ -211,8 +526,8 @@ class FibonacciHeap:
         # if self.min.right is self.min:
         #     self.min = None
         # else:
-        if y.key == 39 and x.key == 18:
-            aaa = 1
+        if self.stats is not None:
+            self.stats.links += 1
         y.left.right = y.right
         y.right.left = y.left
         if x.child is not None:
@@ -224,13 +539,6 @@ class FibonacciHeap:
         x.degree += 1
         y.mark = False
 
-    def max_degree(self):
-        """
-        the max degree of current heap
-        :return: int
-        """
-        return int(math.log(self.n, 1.62))
-
     def cut(self, x, y):
         """
         cut x out from y's children, add x into root list, unmark x
@@ -238,9 +546,15 @@ class FibonacciHeap:
         :param y: Node, previous x's p
         :return:
         """
-        if y.child.size() == 1:
+        if self.stats is not None:
+            self.stats.cuts += 1
+        if y.p is None:
+            self.untable(y)
+        if x.right is x:
             y.child = None
         else:
+            if y.child is x:
+                y.child = x.right
             x.left.right = x.right
             x.right.left = x.left
         y.degree -= 1
@@ -254,14 +568,19 @@ class FibonacciHeap:
         if y is not marked(previously no child of y is cut out), mark it(now 1 of y's child is cut)
         if y is marked(previously 1 child is cut, now 2 of y's child is cut), cut y from y's parent
         :param y: Node
+        :return: int, number of ancestors cut
         """
+        cuts = 0
         z = y.p
-        if z is not None:
+        while z is not None:
             if y.mark is False:
                 y.mark = True
-            else:
-                self.cut(y, z)
-                self.cascading_cut(z)
+                return cuts
+            self.cut(y, z)
+            cuts += 1
+            y = z
+            z = y.p
+        return cuts
 
     def decrease_key(self, x, k):
         """
@@ -274,19 +593,94 @@ class FibonacciHeap:
             raise Exception('new key is greater than current key')
         x.key = k
         y = x.p
+        roots = 0
         if y is not None and x.key < y.key:
             self.cut(x, y)
-            self.cascading_cut(y)
+            cascade = self.cascading_cut(y)
+            if self.stats is not None:
+                self.stats.cascade(cascade)
+            roots = 1 + cascade
         if x.key < self.min.key:
             self.min = x
+        if roots and self.consolidate_budget is not None:
+            # the cut roots are consolidated like inserted ones, so extract_min keeps a short root list
+            self.consolidate_step(roots * self.consolidate_budget)
+
+    def decrease_keys(self, pairs, keys=None):
+        """
+        decrease the keys of many nodes, cutting in a single pass and updating self.min once at the end
+        pairs applied before a bad pair keep their new keys
+        :param pairs: iterable of (Node, new key), or a sequence of nodes when keys is given
+        :param keys: sequence of new keys parallel to pairs, e.g. a NumPy array
+        :raise Exception if a new key is greater than the current key
+        """
+        if keys is not None:
+            pairs = zip(pairs, keys)
+        stats = self.stats
+        cut = self.cut
+        cascading_cut = self.cascading_cut
+        best = self.min
+        roots = 0
+        try:
+            for x, k in pairs:
+                if k > x.key:
+                    raise Exception('new key is greater than current key')
+                x.key = k
+                y = x.p
+                if y is not None and k < y.key:
+                    cut(x, y)
+                    cascade = cascading_cut(y)
+                    if stats is not None:
+                        stats.cascade(cascade)
+                    roots += 1 + cascade
+                if k < best.key:
+                    best = x
+        finally:
+            self.min = best
+            if roots and self.consolidate_budget is not None:
+                self.consolidate_step(roots * self.consolidate_budget)
 
     def delete(self, x):
         """
-        delete node x
+        delete node x, in lazy-delete mode deleting a node that was already deleted does nothing
         :param x: Node
         """
-        self.decrease_key(x, -sys.maxint)
-        self.extract_min()
+        if self.lazy_delete:
+            if not x.deleted:
+                x.deleted = True
+                self.tombstones += 1
+                if self.tombstones > self.compact_threshold * self.n:
+                    self.compact()
+            return
+        y = x.p
+        if y is not None:
+            self.cut(x, y)
+            cascade = self.cascading_cut(y)
+            if self.stats is not None:
+                self.stats.cascade(cascade)
+        self.min = x
+        self.remove_min()
+
+    def compact(self):
+        """
+        rebuild the heap from its unmarked nodes in O(n), dropping every tombstone
+        """
+        live = []
+        dead = []
+        if self.min is not None:
+            for x, _ in self.min.walk():
+                if x.deleted:
+                    dead.append(x)
+                else:
+                    live.append(x)
+        for x in dead:
+            x.p = x.child = x.left = x.right = None
+        h = FibonacciHeap.from_nodes(live)
+        self.min = h.min
+        self.n = h.n
+        self.tombstones = 0
+        del self.degrees[:]
+        self.cursor = None
 
 
 class Test(unittest.TestCase):
@@ -385,6 +779,279 @@ class Test(unittest.TestCase):
         self.assertEqual(h.min.right.degree, 3)
         self.assertEqual(h.min.right.right.degree, 1)
 
+    def test_from_iterable(self):
+        keys = [23, 7, 21, 3, 18, 52, 38, 39, 41, 17, 30, 24, 26, 46, 35]
+        h = FibonacciHeap.from_iterable(keys)
+        self.assertEqual(h.n, 15)
+        self.assertEqual(h.min.key, 3)
+        # 15 = 0b1111, one tree of each degree
+        self.assertEqual(sorted(x.degree for x in h.min.siblings()), [0, 1, 2, 3])
+        self.assertEqual([h.extract_min().key for _ in keys], sorted(keys))
+        self.assertTrue(FibonacciHeap.from_iterable([]).min is None)
+
+    def test_extracted_nodes_are_acyclic(self):
+        import gc
+        h = FibonacciHeap.from_iterable(range(32))
+        gc.collect()
+        gc.disable()
+        try:
+            for _ in range(16):
+                z = h.extract_min()
+                self.assertTrue(z.left is None and z.right is None and z.child is None)
+            for x in h.min.siblings():
+                self.assertTrue(x.p is None)
+            del z
+            # every extracted node was freed by reference counting, the collector finds nothing
+            self.assertEqual(gc.collect(), 0)
+        finally:
+            gc.enable()
+
+    def test_node_pool(self):
+        pool = NodePool(capacity=2)
+        h = FibonacciHeap()
+        nodes = [pool.acquire(k) for k in range(4)]
+        for x in nodes:
+            h.insert(x)
+        for _ in range(3):
+            pool.release(h.extract_min())
+        self.assertEqual(len(pool.free), 2)
+        x = pool.acquire(10, 'a')
+        self.assertTrue(x in nodes)
+        self.assertEqual((x.key, x.payload), (10, 'a'))
+        h.insert(x)
+        h.insert(pool.acquire(-1))
+        self.assertEqual([h.extract_min().key for _ in range(3)], [-1, 3, 10])
+        self.assertTrue(h.extract_min() is None)
+
+    def test_cut_child_head(self):
+        h = FibonacciHeap.from_iterable(range(8))
+        root = h.min
+        x = root.child
+        h.cut(x, root)
+        self.assertTrue(root.child is not x)
+        self.assertEqual(root.child.size(), 2)
+        self.assertTrue(all(c.p is root for c in root.children()))
+        self.assertEqual(root.degree, 2)
+        self.assertTrue(h.min.find_key(x.key))
+
+    def test_consolidate_reuses_degree_table(self):
+        h = FibonacciHeap.from_iterable(range(100, 0, -1))
+        table = h.degrees
+        keys = [h.extract_min().key for _ in range(100)]
+        self.assertEqual(keys, list(range(1, 101)))
+        self.assertTrue(h.degrees is table)
+        self.assertTrue(all(x is None for x in table))
+
+    def test_incremental_consolidation(self):
+        import random
+        rng = random.Random(1)
+        h = FibonacciHeap(consolidate_budget=4)
+        # live nodes in insertion order, so the random choices do not depend on object ids
+        nodes = []
+        for step in range(3000):
+            r = rng.random()
+            if r < 0.5 or not nodes:
+                x = Node(rng.randint(0, 1000))
+                h.insert(x)
+                nodes.append(x)
+            elif r < 0.75:
+                x = h.extract_min()
+                self.assertEqual(x.key, min(y.key for y in nodes))
+                nodes.remove(x)
+            elif r < 0.95:
+                x = rng.choice(nodes)
+                h.decrease_key(x, x.key - rng.randint(0, 100))
+            else:
+                x = rng.choice(nodes)
+                h.delete(x)
+                nodes.remove(x)
+            self.assertEqual(h.n, len(nodes))
+            if nodes:
+                self.assertEqual(h.min.key, min(y.key for y in nodes))
+                roots = h.min.siblings()
+                for d, x in enumerate(h.degrees):
+                    self.assertTrue(x is None or (x.degree == d and x in roots))
+        while nodes:
+            x = h.extract_min()
+            nodes.remove(x)
+        self.assertTrue(h.extract_min() is None)
+
+    def test_incremental_bounds_root_list(self):
+        h = FibonacciHeap(consolidate_budget=2)
+        for k in range(10000):
+            h.insert(Node(k))
+        self.assertTrue(h.min.size() < 64)
+
+    def test_incremental_bounds_root_list_after_cuts(self):
+        import random
+        rng = random.Random(4)
+        for batch in (False, True):
+            h = FibonacciHeap(consolidate_budget=2)
+            nodes = [h.insert(Node(k)) for k in range(10000)]
+            burst = rng.sample(nodes, 3000)
+            if batch:
+                h.decrease_keys([(x, x.key - 10000) for x in burst])
+            else:
+                for x in burst:
+                    h.decrease_key(x, x.key - 10000)
+            self.assertTrue(h.min.size() < 64)
+            keys = sorted(x.key for x in nodes)
+            self.assertEqual([h.extract_min().key for _ in range(100)], keys[:100])
+
+    def test_dump(self):
+        try:
+            from StringIO import StringIO
+        except ImportError:
+            from io import StringIO
+        h = FibonacciHeap.from_iterable(range(2048))
+        f = StringIO()
+        h.dump(f)
+        lines = f.getvalue().splitlines()
+        self.assertEqual(len(lines), 2048)
+        self.assertTrue(lines[0].startswith('key:0'))
+        f = StringIO()
+        h.dump(f, fmt='dot')
+        self.assertEqual(len([l for l in f.getvalue().splitlines() if '->' in l]), 2047)
+        self.assertEqual(sorted(x.key for x, _ in h.min.walk()), list(range(2048)))
+        self.assertEqual([x.key for x in h.min.iter_siblings()], [0])
+        self.assertEqual(len(list(h.min.iter_children())), 11)
+
+    def test_long_cascading_cut(self):
+        # a chain of marked nodes longer than the recursion limit
+        n = sys.getrecursionlimit() + 100
+        nodes = [Node(k) for k in range(n)]
+        for i in range(1, n):
+            nodes[i - 1].child = nodes[i]
+            nodes[i].p = nodes[i - 1]
+            nodes[i - 1].degree = 1
+            nodes[i].mark = True
+        h = FibonacciHeap(nodes[0])
+        h.n = n
+        h.decrease_key(nodes[-1], -1)
+        self.assertEqual(h.min.key, -1)
+        self.assertEqual(h.min.size(), n)
+        self.assertTrue(all(x.p is None and x.child is None for x in h.min.iter_siblings()))
+
+    def test_nsmallest(self):
+        import random
+        rng = random.Random(3)
+        keys = [rng.randint(0, 100) for _ in range(200)]
+        h = FibonacciHeap.from_iterable(keys)
+        for k in (0, 1, 10, 200, 300):
+            self.assertEqual(h.nsmallest(k), sorted(keys)[:k])
+        h.extract_min()
+        self.assertEqual(h.nsmallest(5), sorted(keys)[1:6])
+        self.assertEqual(len(list(h.min.walk())), 199)
+        self.assertEqual(FibonacciHeap().nsmallest(3), [])
+
+    def test_drain(self):
+        import random
+        rng = random.Random(4)
+        keys = [rng.randint(0, 100) for _ in range(200)]
+        self.assertEqual(list(FibonacciHeap.from_iterable(keys).drain()), sorted(keys))
+        h = FibonacciHeap.from_iterable(keys)
+        for i, k in enumerate(h.drain()):
+            if i == 9:
+                break
+        # the abandoned generator leaves the other keys in the heap
+        self.assertEqual(h.n, 190)
+        self.assertEqual(h.nsmallest(3), sorted(keys)[10:13])
+        self.assertEqual(len(list(h.min.walk())), 190)
+        h = FibonacciHeap()
+        for k in (3, 1, 2):
+            h.insert(Node(k, str(k)))
+        self.assertEqual(list(h.drain(payloads=True)), ['1', '2', '3'])
+        self.assertEqual(list(h.drain()), [])
+
+    def test_decrease_keys(self):
+        import random
+        rng = random.Random(5)
+        nodes = [Node(rng.randint(0, 10000)) for _ in range(500)]
+        h = FibonacciHeap()
+        for x in nodes:
+            h.insert(x)
+        h.insert(Node(-1))
+        h.extract_min()
+        batch = rng.sample(nodes, 200)
+        h.decrease_keys([(x, x.key - rng.randint(0, 5000)) for x in batch])
+        self.assertEqual(h.min.key, min(x.key for x in nodes))
+        batch = rng.sample(nodes, 100)
+        h.decrease_keys(batch, [x.key - 1 for x in batch])
+        expected = sorted(x.key for x in nodes)
+        self.assertEqual(h.nsmallest(500), expected)
+        x = nodes[0]
+        self.assertRaises(Exception, h.decrease_keys, [(nodes[1], -20000), (x, x.key + 1)])
+        self.assertEqual(h.min.key, -20000)
+        self.assertEqual([h.extract_min().key for _ in nodes], sorted(y.key for y in nodes))
+
+    def test_union_all(self):
+        heaps = [FibonacciHeap.from_iterable(range(i, 100, 7)) for i in range(7)]
+        heaps.append(FibonacciHeap())
+        h = FibonacciHeap()
+        h.union_all(heaps)
+        self.assertEqual(h.n, 100)
+        self.assertEqual(h.min.key, 0)
+        self.assertTrue(all(h1.min is None and h1.n == 0 for h1 in heaps))
+        h2 = FibonacciHeap.from_iterable([-1, 200])
+        h2.union_all([h])
+        self.assertEqual([h2.extract_min().key for _ in range(102)], [-1] + list(range(100)) + [200])
+
+    def test_lazy_delete(self):
+        import random
+        rng = random.Random(13)
+        for budget in (None, 3):
+            h = FibonacciHeap(consolidate_budget=budget, lazy_delete=True, compact_threshold=0.5)
+            nodes = [Node(rng.random()) for _ in range(300)]
+            for x in nodes:
+                h.insert(x)
+            cancelled = set([nodes.index(h.extract_min())])
+            for i in rng.sample([i for i in range(300) if i not in cancelled], 140):
+                h.delete(nodes[i])
+                cancelled.add(i)
+            self.assertEqual(h.tombstones, 140)
+            live = sorted(nodes[i].key for i in range(300) if i not in cancelled)
+            self.assertEqual(h.nsmallest(3), live[:3])
+            self.assertEqual(h.minimum().key, live[0])
+            for i in [i for i in range(300) if i not in cancelled][-30:]:
+                h.delete(nodes[i])
+                cancelled.add(i)
+            self.assertTrue(h.tombstones < 50)
+            self.assertEqual(h.n - h.tombstones, 300 - len(cancelled))
+            live = sorted(nodes[i].key for i in range(300) if i not in cancelled)
+            out = []
+            while h.minimum() is not None:
+                out.append(h.extract_min().key)
+            self.assertEqual(out, live)
+            self.assertEqual((h.n, h.tombstones), (0, 0))
+
+    def test_lazy_delete_twice(self):
+        # an entry may be cancelled again after compact or minimum has dropped it from the heap
+        for cancelled in (6, 1):
+            h = FibonacciHeap(lazy_delete=True, compact_threshold=0.5)
+            handles = [h.insert(Node(k)) for k in range(10)]
+            for x in handles[:cancelled]:
+                h.delete(x)
+            self.assertEqual(h.minimum().key, cancelled)
+            for x in handles[:cancelled]:
+                h.delete(x)
+            self.assertEqual((h.n, h.tombstones), (10 - cancelled, 0))
+            # a dropped node inserted again is live
+            x = handles[0]
+            h.insert(x)
+            self.assertEqual((h.n, h.tombstones), (11 - cancelled, 0))
+            self.assertEqual([h.extract_min().key for _ in range(h.n)], [0] + list(range(cancelled, 10)))
+
+    def test_delete_non_integer_keys(self):
+        h = FibonacciHeap()
+        nodes = [Node(k) for k in ['m', 'c', 'x', 'a', 'q', 'f', 'z']]
+        for x in nodes:
+            h.insert(x)
+        h.extract_min()
+        h.delete(nodes[1])
+        h.delete(nodes[6])
+        self.assertEqual(h.n, 4)
+        self.assertEqual([h.extract_min().key for _ in range(4)], ['f', 'm', 'q', 'x'])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,365 @@
+import heapq
+import itertools
+import random
+import unittest
+from array import array
+
+import radix_heap
+from priority_queue import ENGINES
+
+INFINITY = float('inf')
+
+
+class HeapqNode(object):
+    """
+    node of HeapqHeap, entry is its live entry in the heapq list
+    """
+    __slots__ = ('key', 'payload', 'entry')
+
+    def __init__(self, key, payload=None):
+        self.key = key
+        self.payload = payload
+        self.entry = None
+
+
+class HeapqHeap:
+    """
+    heapq baseline with the heap interface, decrease_key and delete leave the old entry stale
+    """
+    def __init__(self):
+        self.entries = []
+        self.n = 0
+        self.counter = itertools.count()
+
+    def push(self, x):
+        entry = [x.key, next(self.counter), x]
+        x.entry = entry
+        heapq.heappush(self.entries, entry)
+
+    def insert(self, x):
+        self.push(x)
+        self.n += 1
+        return x
+
+    def minimum(self):
+        while self.entries and self.entries[0][2] is None:
+            heapq.heappop(self.entries)
+        return self.entries[0][2] if self.entries else None
+
+    def extract_min(self):
+        while self.entries:
+            x = heapq.heappop(self.entries)[2]
+            if x is not None:
+                x.entry = None
+                self.n -= 1
+                return x
+        return None
+
+    def decrease_key(self, x, k):
+        x.entry[2] = None
+        x.key = k
+        self.push(x)
+
+    def delete(self, x):
+        x.entry[2] = None
+        x.entry = None
+        self.n -= 1
+
+    def union(self, h):
+        self.entries.extend(h.entries)
+        heapq.heapify(self.entries)
+        self.n += h.n
+        h.entries = []
+        h.n = 0
+
+
+# engine name -> (heap class, node class), the heap engines and the heapq baseline
+GRAPH_ENGINES = dict(ENGINES, heapq=(HeapqHeap, HeapqNode),
+                     radix=(radix_heap.RadixHeap, radix_heap.Node))
+
+# engines that only accept integer keys never below the last extracted one, so they run
+# dijkstra and astar on graphs with integer weights, but not prim
+MONOTONE_ENGINES = ('radix',)
+
+
+class CSRGraph:
+    """
+    weighted directed graph in compressed sparse row form
+    the edges out of v are targets[offsets[v]:offsets[v + 1]], with the same slice of weights
+    """
+    def __init__(self, offsets, targets, weights):
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.n = len(offsets) - 1
+
+    def __len__(self):
+        return self.n
+
+    def edges(self, v):
+        """
+        :param v: int, vertex
+        :return: generator of (target, weight) of the edges out of v
+        """
+        for i in range(self.offsets[v], self.offsets[v + 1]):
+            yield self.targets[i], self.weights[i]
+
+    @classmethod
+    def from_edges(cls, n, edges, undirected=False, typecode='d'):
+        """
+        build a graph with a counting sort of its edges
+        :param n: int, number of vertices
+        :param edges: list of (source, target, weight)
+        :param undirected: bool, add every edge in both directions
+        :param typecode: str, array typecode of the weights, 'l' keeps integer weights and distances
+        :return: CSRGraph
+        """
+        if undirected:
+            edges = edges + [(v, u, w) for u, v, w in edges]
+        offsets = array('l', [0]) * (n + 1)
+        for u, _, _ in edges:
+            offsets[u + 1] += 1
+        for v in range(n):
+            offsets[v + 1] += offsets[v]
+        fill = offsets[:-1]
+        targets = array('l', [0]) * len(edges)
+        weights = array(typecode, [0]) * len(edges)
+        for u, v, w in edges:
+            i = fill[u]
+            targets[i] = v
+            weights[i] = w
+            fill[u] = i + 1
+        return cls(offsets, targets, weights)
+
+    @classmethod
+    def random_graph(cls, n, degree=4, max_weight=100, seed=0, undirected=False):
+        """
+        random sparse graph with integer weights, made connected by a random path through every vertex
+        :param n: int, number of vertices
+        :param degree: int, average number of edges out of a vertex, at least 1
+        :param max_weight: int, weights are in [1, max_weight]
+        :param seed: int, random seed
+        :param undirected: bool
+        :return: CSRGraph
+        """
+        rng = random.Random(seed)
+        order = list(range(n))
+        rng.shuffle(order)
+        edges = [(order[i], order[i + 1], rng.randint(1, max_weight)) for i in range(n - 1)]
+        for _ in range(max(0, degree - 1) * n):
+            edges.append((rng.randrange(n), rng.randrange(n), rng.randint(1, max_weight)))
+        if not undirected:
+            edges.append((order[-1], order[0], rng.randint(1, max_weight)))
+        return cls.from_edges(n, edges, undirected, 'l')
+
+
+def dijkstra(g, sources, target=None, engine='fibonacci'):
+    """
+    shortest paths from the nearest of several sources, weights must be non-negative
+    every vertex is inserted when first reached and lowered with decrease_key
+    :param g: CSRGraph
+    :param sources: int or iterable of int, source vertices
+    :param target: int, stop as soon as the distance of target is final
+    :param engine: str, key of GRAPH_ENGINES
+    :return: (dist, pred), lists indexed by vertex, INFINITY and -1 where unreached
+    """
+    heap_class, node_class = GRAPH_ENGINES[engine]
+    if isinstance(sources, int):
+        sources = [sources]
+    offsets, targets, weights = g.offsets, g.targets, g.weights
+    dist = [INFINITY] * g.n
+    pred = [-1] * g.n
+    nodes = [None] * g.n
+    done = bytearray(g.n)
+    h = heap_class()
+    for s in sources:
+        if nodes[s] is None:
+            dist[s] = 0
+            nodes[s] = h.insert(node_class(0, s))
+    while True:
+        x = h.extract_min()
+        if x is None:
+            break
+        u = x.payload
+        nodes[u] = None
+        done[u] = 1
+        if u == target:
+            break
+        du = x.key
+        for i in range(offsets[u], offsets[u + 1]):
+            v = targets[i]
+            d = du + weights[i]
+            if d < dist[v] and not done[v]:
+                dist[v] = d
+                pred[v] = u
+                y = nodes[v]
+                if y is None:
+                    nodes[v] = h.insert(node_class(d, v))
+                else:
+                    h.decrease_key(y, d)
+    return dist, pred
+
+
+def path(pred, target):
+    """
+    :param pred: list, predecessors from dijkstra, prim or astar
+    :param target: int, vertex
+    :return: list of vertices from the root of target to target
+    """
+    p = [target]
+    while pred[p[-1]] != -1:
+        p.append(pred[p[-1]])
+    p.reverse()
+    return p
+
+
+def astar(g, source, target, heuristic, engine='fibonacci'):
+    """
+    A* search, heuristic must be consistent: heuristic(u) <= w(u, v) + heuristic(v) for every edge
+    :param g: CSRGraph
+    :param source: int
+    :param target: int
+    :param heuristic: function vertex -> lower bound of its distance to target
+    :param engine: str, key of GRAPH_ENGINES
+    :return: (distance, path), (INFINITY, []) if target is unreachable
+    """
+    heap_class, node_class = GRAPH_ENGINES[engine]
+    offsets, targets, weights = g.offsets, g.targets, g.weights
+    dist = {source: 0}
+    pred = {source: -1}
+    nodes = {}
+    done = set()
+    h = heap_class()
+    nodes[source] = h.insert(node_class(heuristic(source), source))
+    while True:
+        x = h.extract_min()
+        if x is None:
+            return INFINITY, []
+        u = x.payload
+        del nodes[u]
+        if u == target:
+            return dist[u], path(pred, target)
+        done.add(u)
+        du = dist[u]
+        for i in range(offsets[u], offsets[u + 1]):
+            v = targets[i]
+            d = du + weights[i]
+            if v not in done and d < dist.get(v, INFINITY):
+                dist[v] = d
+                pred[v] = u
+                y = nodes.get(v)
+                if y is None:
+                    nodes[v] = h.insert(node_class(d + heuristic(v), v))
+                else:
+                    h.decrease_key(y, d + heuristic(v))
+
+
+def prim(g, engine='fibonacci'):
+    """
+    minimum spanning forest of an undirected graph, every edge must be stored in both directions
+    :param g: CSRGraph
+    :param engine: str, key of GRAPH_ENGINES
+    :return: (pred, weight), pred[v] is the parent of v in its tree or -1 for a root, and total weight
+    :raise Exception if engine is monotone
+    """
+    if engine in MONOTONE_ENGINES:
+        raise Exception('prim needs an engine that is not monotone')
+    heap_class, node_class = GRAPH_ENGINES[engine]
+    offsets, targets, weights = g.offsets, g.targets, g.weights
+    pred = [-1] * g.n
+    nodes = [None] * g.n
+    done = bytearray(g.n)
+    total = 0
+    h = heap_class()
+    for root in range(g.n):
+        if done[root]:
+            continue
+        nodes[root] = h.insert(node_class(0, root))
+        while True:
+            x = h.extract_min()
+            if x is None:
+                break
+            u = x.payload
+            nodes[u] = None
+            done[u] = 1
+            total += x.key
+            for i in range(offsets[u], offsets[u + 1]):
+                v = targets[i]
+                if done[v]:
+                    continue
+                w = weights[i]
+                y = nodes[v]
+                if y is None:
+                    pred[v] = u
+                    nodes[v] = h.insert(node_class(w, v))
+                elif w < y.key:
+                    pred[v] = u
+                    h.decrease_key(y, w)
+    return pred, total
+
+
+class TestGraph(unittest.TestCase):
+    def setUp(self):
+        #   0 -1- 1 -2- 2
+        #   |4    |1    |7
+        #   3 -3- 4 -1- 5
+        self.edges = [(0, 1, 1), (1, 2, 2), (0, 3, 4), (1, 4, 1), (2, 5, 7), (3, 4, 3), (4, 5, 1)]
+        self.g = CSRGraph.from_edges(6, self.edges, undirected=True, typecode='l')
+
+    def test_csr(self):
+        g = CSRGraph.from_edges(3, [(0, 1, 5), (2, 0, 1), (0, 2, 2)])
+        self.assertEqual(list(g.offsets), [0, 2, 2, 3])
+        self.assertEqual(sorted(g.edges(0)), [(1, 5), (2, 2)])
+        self.assertEqual(list(g.edges(1)), [])
+        self.assertEqual(len(self.g), 6)
+        self.assertEqual(len(self.g.targets), 14)
+        self.assertEqual(CSRGraph.random_graph(10).weights.typecode, 'l')
+
+    def test_dijkstra(self):
+        for engine in sorted(GRAPH_ENGINES):
+            dist, pred = dijkstra(self.g, 0, engine=engine)
+            self.assertEqual(dist, [0, 1, 3, 4, 2, 3])
+            self.assertEqual(path(pred, 5), [0, 1, 4, 5])
+            dist, pred = dijkstra(self.g, [2, 3], engine=engine)
+            self.assertEqual(dist, [3, 2, 0, 0, 3, 4])
+            dist, pred = dijkstra(self.g, 0, target=4, engine=engine)
+            self.assertEqual(dist[4], 2)
+            self.assertEqual(dist[2], 3)
+            self.assertEqual(dist[3], 4)
+            # 5 is only reached through 4, which ends the search
+            self.assertEqual(dist[5], INFINITY)
+
+    def test_astar(self):
+        for engine in sorted(GRAPH_ENGINES):
+            self.assertEqual(astar(self.g, 0, 5, lambda v: 0, engine), (3, [0, 1, 4, 5]))
+            g = CSRGraph.from_edges(3, [(0, 1, 1)], typecode='l')
+            self.assertEqual(astar(g, 0, 2, lambda v: 0, engine), (INFINITY, []))
+
+    def test_prim(self):
+        for engine in sorted(set(GRAPH_ENGINES) - set(MONOTONE_ENGINES)):
+            pred, total = prim(self.g, engine)
+            self.assertEqual(total, 8)
+            self.assertEqual(pred, [-1, 0, 1, 4, 1, 4])
+        g = CSRGraph.from_edges(4, [(0, 1, 2), (2, 3, 5)], undirected=True)
+        self.assertEqual(prim(g), ([-1, 0, -1, 2], 7))
+        self.assertRaises(Exception, prim, g, 'radix')
+
+    def test_random_graph(self):
+        g = CSRGraph.random_graph(300, degree=3, seed=4)
+        dists = [dijkstra(g, 0, engine=engine)[0] for engine in sorted(GRAPH_ENGINES)]
+        for d in dists[1:]:
+            self.assertEqual(d, dists[0])
+        self.assertTrue(INFINITY not in dists[0])
+        for t in (17, 150, 299):
+            d, p = astar(g, 0, t, lambda v: 0)
+            self.assertEqual(d, dists[0][t])
+            self.assertEqual(p[0], 0)
+            self.assertEqual(p[-1], t)
+            self.assertEqual(dijkstra(g, 0, target=t)[0][t], d)
+        u = CSRGraph.random_graph(300, degree=3, seed=5, undirected=True)
+        totals = [prim(u, engine)[1] for engine in sorted(set(GRAPH_ENGINES) - set(MONOTONE_ENGINES))]
+        self.assertEqual(totals, [totals[0]] * len(totals))
+
+
+if __name__ == '__main__':
+    unittest.main()
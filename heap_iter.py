@@ -0,0 +1,94 @@
+import heapq
+import itertools
+import unittest
+
+
+def drain(heap, payloads=False):
+    """
+    extract every node of a heap in increasing key order, one at a time
+    each node is extracted before it is yielded, so a caller that stops early leaves the
+    heap holding exactly the nodes it has not received
+    :param heap: any heap whose extract_min returns a node with key and payload, or None when empty
+    :param payloads: bool, yield payloads instead of keys
+    :return: generator of keys or payloads
+    """
+    while True:
+        x = heap.extract_min()
+        if x is None:
+            return
+        yield x.payload if payloads else x.key
+
+
+def nsmallest(roots, k):
+    """
+    the k smallest keys of a heap-ordered forest in increasing order, without changing it
+    best-first search from the roots, where popping a node makes its children candidates, so only
+    the roots, the popped nodes and their children are visited. nodes marked deleted are skipped
+    :param roots: iterable of root nodes, whose key, deleted and child are read, and whose children
+                  are child.iter_siblings()
+    :param k: int
+    :return: list of keys
+    """
+    keys = []
+    if k <= 0:
+        return keys
+    seq = itertools.count()
+    frontier = [(x.key, next(seq), x) for x in roots]
+    heapq.heapify(frontier)
+    while frontier and len(keys) < k:
+        key, _, x = heapq.heappop(frontier)
+        if not x.deleted:
+            keys.append(key)
+        if x.child is not None:
+            for c in x.child.iter_siblings():
+                heapq.heappush(frontier, (c.key, next(seq), c))
+    return keys
+
+
+class TestDrain(unittest.TestCase):
+    class Node(object):
+        def __init__(self, key, payload=None):
+            self.key = key
+            self.payload = payload
+
+    class SortedHeap:
+        def __init__(self, nodes):
+            self.nodes = sorted(nodes, key=lambda x: x.key)
+
+        def extract_min(self):
+            return self.nodes.pop(0) if self.nodes else None
+
+    def test_drain(self):
+        h = self.SortedHeap(self.Node(k, str(k)) for k in [5, 1, 4, 2, 3])
+        it = drain(h)
+        self.assertEqual([next(it), next(it)], [1, 2])
+        self.assertEqual([x.key for x in h.nodes], [3, 4, 5])
+        self.assertEqual(list(drain(h, payloads=True)), ['3', '4', '5'])
+        self.assertEqual(list(it), [])
+
+
+class TestNsmallest(unittest.TestCase):
+    class Node(object):
+        def __init__(self, key, children=(), deleted=False):
+            self.key = key
+            self.deleted = deleted
+            self.siblings = [self]
+            self.child = None
+            if children:
+                self.child = children[0]
+                self.child.siblings = list(children)
+
+        def iter_siblings(self):
+            return iter(self.siblings)
+
+    def test_nsmallest(self):
+        node = self.Node
+        roots = [node(1, [node(4, [node(9)]), node(2, deleted=True)]), node(3, [node(5), node(6)])]
+        self.assertEqual(nsmallest(roots, 4), [1, 3, 4, 5])
+        self.assertEqual(nsmallest(roots, 10), [1, 3, 4, 5, 6, 9])
+        self.assertEqual(nsmallest(roots, 0), [])
+        self.assertEqual(nsmallest([], 3), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
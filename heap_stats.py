@@ -0,0 +1,224 @@
+import timeit
+import unittest
+
+# operations whose latency is recorded by HeapStats.attach
+TIMED_OPERATIONS = ('insert', 'minimum', 'extract_min', 'union', 'decrease_key', 'delete')
+
+COUNTERS = ('links', 'cuts', 'cascading_cuts', 'max_cascade_depth', 'swaps',
+            'consolidates', 'roots_visited', 'max_root_list')
+
+
+class Histogram:
+    """
+    latency histogram with one bucket per power of two nanoseconds
+    """
+    def __init__(self):
+        self.buckets = [0] * 64
+        self.count = 0
+        self.max = 0.0
+
+    def add(self, t):
+        """
+        record a latency
+        :param t: float, seconds
+        """
+        self.buckets[int(t * 1e9).bit_length()] += 1
+        self.count += 1
+        if t > self.max:
+            self.max = t
+
+    def percentile(self, q):
+        """
+        upper bound of the bucket holding the q-th percentile
+        :param q: float, 0 < q <= 100
+        :return: float, seconds
+        """
+        if self.count == 0:
+            return 0.0
+        rank = q / 100.0 * self.count
+        seen = 0
+        for i, c in enumerate(self.buckets):
+            seen += c
+            if seen >= rank:
+                return min(2 ** i / 1e9, self.max)
+        return self.max
+
+    def snapshot(self):
+        """
+        :return: dict with count, p50, p99 and max, in seconds
+        """
+        return {'count': self.count, 'p50': self.percentile(50),
+                'p99': self.percentile(99), 'max': self.max}
+
+
+class HeapStats:
+    """
+    structural counters and per-operation latency histograms for a BinomialHeap or FibonacciHeap
+    the heaps only update the counters when their stats attribute is set, and latency is
+    recorded by wrapping the operations of attached heaps, so detached heaps pay nothing
+    """
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """
+        zero every counter and histogram
+        """
+        for name in COUNTERS:
+            setattr(self, name, 0)
+        self.latency = dict((op, Histogram()) for op in TIMED_OPERATIONS)
+
+    def cascade(self, depth):
+        """
+        record a cascading cut chain
+        :param depth: int, number of ancestors cut after the decreased node
+        """
+        if depth > 0:
+            self.cascading_cuts += 1
+            if depth > self.max_cascade_depth:
+                self.max_cascade_depth = depth
+
+    def root_list(self, length):
+        """
+        record a root list walk
+        :param length: int, number of roots visited
+        """
+        self.roots_visited += length
+        if length > self.max_root_list:
+            self.max_root_list = length
+
+    def attach(self, heap):
+        """
+        start collecting stats for heap
+        :param heap: BinomialHeap or FibonacciHeap
+        """
+        heap.stats = self
+        # number of timed calls in progress on heap, shared by its wrappers
+        depth = [0]
+        for op in TIMED_OPERATIONS:
+            setattr(heap, op, self.timed(getattr(heap, op), self.latency[op], depth))
+
+    @staticmethod
+    def detach(heap):
+        """
+        stop collecting stats for heap
+        :param heap: BinomialHeap or FibonacciHeap
+        """
+        heap.stats = None
+        for op in TIMED_OPERATIONS:
+            if op in heap.__dict__:
+                delattr(heap, op)
+
+    @staticmethod
+    def timed(f, histogram, depth):
+        """
+        wrap f so that every call is recorded in histogram, unless it is made by another timed call
+        such as the union inside insert, whose time is already recorded by the outer call
+        :param depth: list holding the number of timed calls in progress on the heap
+        """
+        # time.time() only resolves about 0.24 us at current epoch values, the cost of a fast insert,
+        # default_timer is time.perf_counter on Python 3, and the platform's best timer on Python 2
+        timer = timeit.default_timer
+
+        def timed_f(*args):
+            if depth[0]:
+                return f(*args)
+            depth[0] += 1
+            try:
+                t = timer()
+                result = f(*args)
+                histogram.add(timer() - t)
+            finally:
+                depth[0] -= 1
+            return result
+        return timed_f
+
+    def snapshot(self):
+        """
+        :return: dict, {'counters': {name: int}, 'latency': {operation: {count, p50, p99, max}}}
+        """
+        return {'counters': dict((name, getattr(self, name)) for name in COUNTERS),
+                'latency': dict((op, h.snapshot()) for op, h in self.latency.items() if h.count)}
+
+
+class TestHeapStats(unittest.TestCase):
+    def test_histogram(self):
+        h = Histogram()
+        for _ in range(99):
+            h.add(1e-6)
+        h.add(1e-3)
+        s = h.snapshot()
+        self.assertEqual(s['count'], 100)
+        self.assertTrue(1e-6 <= s['p50'] <= 2e-6)
+        self.assertTrue(1e-6 <= s['p99'] <= 2e-6)
+        self.assertEqual(s['max'], 1e-3)
+        self.assertEqual(Histogram().percentile(50), 0.0)
+
+    def test_fibonacci(self):
+        from fibonacci_heap import FibonacciHeap, Node
+        stats = HeapStats()
+        h = FibonacciHeap()
+        stats.attach(h)
+        nodes = [Node(k) for k in range(64)]
+        for x in nodes:
+            h.insert(x)
+        h.extract_min()
+        self.assertEqual(stats.consolidates, 1)
+        self.assertEqual(stats.max_root_list, 63)
+        self.assertEqual(stats.links, 57)
+        for x in reversed(nodes[1:]):
+            if x.p is not None:
+                h.decrease_key(x, x.key - 100)
+        self.assertTrue(stats.cuts > 0)
+        self.assertTrue(stats.cascading_cuts > 0)
+        self.assertTrue(stats.max_cascade_depth > 0)
+        s = stats.snapshot()
+        self.assertEqual(s['latency']['insert']['count'], 64)
+        self.assertEqual(s['latency']['extract_min']['count'], 1)
+        self.assertTrue(s['latency']['decrease_key']['max'] >= s['latency']['decrease_key']['p50'])
+        stats.reset()
+        self.assertEqual(stats.snapshot(), {'counters': dict((name, 0) for name in COUNTERS), 'latency': {}})
+        HeapStats.detach(h)
+        h.extract_min()
+        self.assertEqual(stats.consolidates, 0)
+        self.assertFalse('extract_min' in h.__dict__)
+
+    def test_binomial(self):
+        from binomial_heap import BinomialHeap, Node
+        stats = HeapStats()
+        h = BinomialHeap()
+        stats.attach(h)
+        nodes = [Node(k) for k in range(16)]
+        for x in nodes:
+            h.insert(x)
+        self.assertEqual(stats.links, 15)
+        h.decrease_key(nodes[15], -1)
+        self.assertEqual(stats.swaps, 4)
+        lazy = BinomialHeap(lazy=True)
+        stats.attach(lazy)
+        for k in range(8):
+            lazy.insert(Node(k))
+        lazy.minimum()
+        self.assertEqual(stats.consolidates, 1)
+        self.assertEqual(stats.links, 15 + 7)
+        self.assertEqual(stats.snapshot()['latency']['insert']['count'], 24)
+
+    def test_nested_calls(self):
+        from binomial_heap import BinomialHeap, Node
+        stats = HeapStats()
+        h = BinomialHeap()
+        stats.attach(h)
+        for k in range(100):
+            h.insert(Node(k))
+        for _ in range(10):
+            h.extract_min()
+        # the union and minimum calls made inside insert and extract_min are not recorded
+        self.assertEqual(sorted(stats.snapshot()['latency']), ['extract_min', 'insert'])
+        self.assertEqual(stats.latency['insert'].count, 100)
+        self.assertEqual(stats.latency['extract_min'].count, 10)
+        h.union(BinomialHeap())
+        self.assertEqual(stats.latency['union'].count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+import itertools
+import random
+import unittest
+
+from priority_queue import ENGINES
+
+
+class Stream(object):
+    """
+    handle of a stream in a StreamMerger, node is the handle of its node in the heap,
+    None once it is exhausted or removed
+    """
+    __slots__ = ('iterator', 'index', 'node', 'value')
+
+    def __init__(self, iterator, index):
+        self.iterator = iterator
+        self.index = index
+        self.node = None
+        self.value = None
+
+
+class StreamMerger:
+    """
+    lazy k-way merge of sorted iterables with one heap node per live stream, so it holds O(k) values
+    the node key of a stream is (key of its next value, index of the stream), which keeps equal
+    values in the order of their streams. streams can be added, removed and boosted while merging
+    """
+    def __init__(self, iterables=(), key=None, engine='pairing'):
+        if engine not in ENGINES:
+            raise Exception('unknown heap engine: ' + str(engine))
+        heap_class, self.node_class = ENGINES[engine]
+        self.heap = heap_class()
+        self.key = key
+        self.counter = itertools.count()
+        for iterable in iterables:
+            self.add(iterable)
+
+    def __len__(self):
+        return self.heap.n
+
+    def add(self, iterable):
+        """
+        add a sorted iterable to the merge
+        :param iterable: iterable sorted by key
+        :return: Stream, handle of the stream
+        """
+        stream = Stream(iter(iterable), next(self.counter))
+        self.pull(stream)
+        return stream
+
+    def pull(self, stream):
+        """
+        insert a node for the next value of stream, if it has one
+        :param stream: Stream
+        """
+        for value in stream.iterator:
+            stream.value = value
+            key = value if self.key is None else self.key(value)
+            stream.node = self.heap.insert(self.node_class((key, stream.index), stream))
+            return
+        stream.node = stream.value = None
+
+    def remove(self, stream):
+        """
+        drop a stream from the merge, its remaining values are not pulled
+        :param stream: Stream
+        """
+        if stream.node is not None:
+            self.heap.delete(stream.node)
+            stream.node = stream.value = None
+
+    def boost(self, stream, k):
+        """
+        move the next value of a stream forward, as if its key were k, the values after it keep their keys
+        :param stream: Stream, not exhausted
+        :param k: key, not greater than the key of the next value of stream
+        :raise Exception if k is greater than that key
+        """
+        self.heap.decrease_key(stream.node, (k, stream.index))
+
+    def __iter__(self):
+        heap = self.heap
+        while True:
+            x = heap.extract_min()
+            if x is None:
+                return
+            stream = x.payload
+            value = stream.value
+            self.pull(stream)
+            yield value
+
+
+def merge(*iterables, **kwargs):
+    """
+    merge sorted iterables lazily into a single sorted iterator, like heapq.merge
+    :param iterables: iterables sorted by key
+    :param key: function value -> key, by keyword only
+    :param engine: str, key of ENGINES, by keyword only
+    :return: generator of the merged values
+    """
+    return iter(StreamMerger(iterables, **kwargs))
+
+
+class TestMerge(unittest.TestCase):
+    def test_merge(self):
+        rng = random.Random(1)
+        streams = [sorted(rng.randint(0, 100) for _ in range(rng.randint(0, 30))) for _ in range(20)]
+        expected = sorted(itertools.chain(*streams))
+        for engine in sorted(ENGINES):
+            self.assertEqual(list(merge(*streams, engine=engine)), expected)
+        self.assertEqual(list(merge()), [])
+        words = [['a', 'bb', 'ccc'], ['B', 'DD'], ['zzzz']]
+        self.assertEqual(list(merge(*words, key=len)), ['a', 'B', 'bb', 'DD', 'ccc', 'zzzz'])
+        self.assertRaises(Exception, merge, [1], engine='nope')
+
+    def test_lazy(self):
+        pulled = []
+
+        def stream(keys):
+            for k in keys:
+                pulled.append(k)
+                yield k
+
+        m = merge(stream(itertools.count(0, 2)), stream(itertools.count(1, 2)))
+        self.assertEqual([next(m) for _ in range(5)], [0, 1, 2, 3, 4])
+        self.assertEqual(sorted(pulled), list(range(7)))
+
+    def test_remove_and_boost(self):
+        m = StreamMerger()
+        a = m.add([1, 4, 7, 10])
+        b = m.add([2, 5, 8, 11])
+        c = m.add([3, 6, 9, 12])
+        self.assertEqual(len(m), 3)
+        out = iter(m)
+        self.assertEqual([next(out), next(out)], [1, 2])
+        m.remove(b)
+        self.assertEqual(b.node, None)
+        m.remove(b)
+        self.assertRaises(Exception, m.boost, a, 100)
+        # 4 is the next value of a, it goes out before 3, and 7 keeps its place
+        m.boost(a, 0)
+        self.assertEqual(list(out), [4, 3, 6, 7, 9, 10, 12])
+
+    def test_one_node_per_stream(self):
+        m = StreamMerger((iter(range(i, 1000, 50)) for i in range(50)), engine='binomial')
+        out = []
+        for value in m:
+            out.append(value)
+            self.assertEqual(len(m), 50 if value < 950 else 999 - value)
+        self.assertEqual(out, list(range(1000)))
+
+
+if __name__ == '__main__':
+    unittest.main()
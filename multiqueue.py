@@ -0,0 +1,161 @@
+import bisect
+import random
+import threading
+import time
+import unittest
+
+from priority_queue import ENGINES
+
+
+class Empty(Exception):
+    """
+    raised by MultiQueue.pop when every shard is empty
+    """
+
+
+class MultiQueue:
+    """
+    relaxed concurrent priority queue made of lock-protected heap shards
+    push goes to a random shard and pop takes the smaller minimum of `choices` random shards,
+    so threads rarely wait on the same lock. pop returns an element whose rank is expected to be
+    within O(shards) of the true minimum, more shards scale better and more choices lower the error
+    """
+    def __init__(self, shards=8, engine='fibonacci', choices=2, seed=None):
+        if engine not in ENGINES:
+            raise Exception('unknown heap engine: ' + str(engine))
+        if shards < 1 or choices < 1:
+            raise Exception('shards and choices must be positive')
+        heap_class, self.node_class = ENGINES[engine]
+        self.heaps = [heap_class() for _ in range(shards)]
+        self.locks = [threading.Lock() for _ in range(shards)]
+        # min key of every shard, None when it is empty, only written under the shard's lock
+        self.tops = [None] * shards
+        self.choices = min(choices, shards)
+        self.random = random.Random(seed)
+
+    def __len__(self):
+        return sum(h.n for h in self.heaps)
+
+    def lock_random_shard(self):
+        """
+        lock a random shard, trying other shards while the ones picked are busy
+        :return: int, index of the locked shard
+        """
+        shards = len(self.heaps)
+        for _ in range(shards):
+            i = self.random.randrange(shards)
+            if self.locks[i].acquire(False):
+                return i
+        i = self.random.randrange(shards)
+        self.locks[i].acquire()
+        return i
+
+    def push(self, key, payload=None):
+        """
+        add key with an optional payload
+        :param key: key
+        :param payload: payload of key
+        """
+        i = self.lock_random_shard()
+        try:
+            h = self.heaps[i]
+            h.insert(self.node_class(key, payload))
+            self.tops[i] = h.minimum().key
+        finally:
+            self.locks[i].release()
+
+    def pop(self):
+        """
+        remove and return an element close to the minimum
+        :return: (key, payload)
+        :raise Empty if every shard is empty
+        """
+        shards = len(self.heaps)
+        while True:
+            best = best_top = None
+            for _ in range(self.choices):
+                i = self.random.randrange(shards)
+                top = self.tops[i]
+                if top is not None and (best is None or top < best_top):
+                    best, best_top = i, top
+            if best is None:
+                # the sampled shards are empty, fall back to any shard that is not
+                tops = [i for i in range(shards) if self.tops[i] is not None]
+                if not tops:
+                    raise Empty('pop from an empty queue')
+                best = self.random.choice(tops)
+            if not self.locks[best].acquire(False):
+                continue
+            try:
+                h = self.heaps[best]
+                x = h.extract_min()
+                if x is None:
+                    continue
+                m = h.minimum()
+                self.tops[best] = m.key if m is not None else None
+                return x.key, x.payload
+            finally:
+                self.locks[best].release()
+
+
+class TestMultiQueue(unittest.TestCase):
+    def test_single_shard_is_exact(self):
+        q = MultiQueue(shards=1, engine='binomial', seed=1)
+        for k in [5, 3, 9, 1, 7]:
+            q.push(k, str(k))
+        self.assertEqual(len(q), 5)
+        self.assertEqual([q.pop() for _ in range(5)], [(1, '1'), (3, '3'), (5, '5'), (7, '7'), (9, '9')])
+        self.assertRaises(Empty, q.pop)
+
+    def test_rank_error(self):
+        q = MultiQueue(shards=4, seed=2)
+        n = 2000
+        for k in range(n):
+            q.push(k)
+        remaining = list(range(n))
+        ranks = []
+        for _ in range(n):
+            k = q.pop()[0]
+            i = bisect.bisect_left(remaining, k)
+            self.assertEqual(remaining.pop(i), k)
+            ranks.append(i)
+        self.assertEqual(remaining, [])
+        self.assertTrue(max(ranks) < 40)
+        self.assertTrue(sum(ranks) / float(n) < 4)
+
+    def test_threads(self):
+        q = MultiQueue(shards=8, seed=3)
+        popped = []
+        lock = threading.Lock()
+
+        def produce(start):
+            for k in range(start, start + 500):
+                q.push(k)
+
+        def consume():
+            got = []
+            while len(got) < 500:
+                try:
+                    got.append(q.pop()[0])
+                except Empty:
+                    # the producers are behind, let them run
+                    time.sleep(0)
+            with lock:
+                popped.extend(got)
+
+        threads = [threading.Thread(target=produce, args=(i * 500,)) for i in range(4)]
+        threads += [threading.Thread(target=consume) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(sorted(popped), list(range(2000)))
+        self.assertEqual(len(q), 0)
+
+    def test_bad_arguments(self):
+        self.assertRaises(Exception, MultiQueue, 0)
+        self.assertRaises(Exception, MultiQueue, 4, 'nope')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,248 @@
+import random
+import unittest
+
+import heap_iter
+
+
+class Node(object):
+    """
+    node of a PairingHeap, children are a sibling list from child
+    prev is the left sibling of the node, or its parent if it is the first child
+    """
+    __slots__ = ('key', 'payload', 'child', 'sibling', 'prev')
+
+    def __init__(self, key, payload=None):
+        self.key = key
+        self.payload = payload
+        self.child = None
+        self.sibling = None
+        self.prev = None
+
+    def __str__(self):
+        return str(self.key)
+
+
+class PairingHeap:
+    """
+    multi-way heap ordered tree with a single root, rebuilt by two-pass pairing on extract_min
+    insert, union and decrease_key are a single link, which keeps its constant factors small
+    """
+    def __init__(self):
+        self.root = None
+        self.n = 0
+        self.stats = None
+
+    @classmethod
+    def from_iterable(cls, keys):
+        """
+        build a heap holding keys in O(n), the first extract_min pairs them up
+        :param keys: iterable of keys
+        :return: PairingHeap
+        """
+        h = cls()
+        for k in keys:
+            h.insert(Node(k))
+        return h
+
+    def link(self, a, b):
+        """
+        make the root with the larger key the first child of the other
+        :param a: Node, root without siblings
+        :param b: Node, root without siblings
+        :return: Node, the root of the linked tree
+        """
+        if self.stats is not None:
+            self.stats.links += 1
+        if b.key < a.key:
+            a, b = b, a
+        b.prev = a
+        b.sibling = a.child
+        if a.child is not None:
+            a.child.prev = b
+        a.child = b
+        return a
+
+    def merge_pairs(self, first):
+        """
+        link a sibling list into one tree: link pairs left to right, then the pairs right to left
+        :param first: Node, first node of the list
+        :return: Node, root of the tree
+        """
+        pairs = []
+        x = first
+        while x is not None:
+            a = x
+            b = a.sibling
+            a.prev = a.sibling = None
+            if b is None:
+                pairs.append(a)
+                break
+            x = b.sibling
+            b.prev = b.sibling = None
+            pairs.append(self.link(a, b))
+        r = pairs.pop()
+        while pairs:
+            r = self.link(pairs.pop(), r)
+        return r
+
+    def cut(self, x):
+        """
+        take the subtree of x out of its parent's child list
+        :param x: Node, not the root
+        """
+        if x.prev.child is x:
+            x.prev.child = x.sibling
+        else:
+            x.prev.sibling = x.sibling
+        if x.sibling is not None:
+            x.sibling.prev = x.prev
+        x.prev = x.sibling = None
+
+    def minimum(self):
+        """
+        return the node with the minimum key
+        :return: Node, None if heap is empty
+        """
+        return self.root
+
+    def insert(self, x):
+        """
+        insert node x, self.n += 1
+        :param x: Node
+        :return: Node, x is its own handle
+        """
+        x.child = x.sibling = x.prev = None
+        self.root = x if self.root is None else self.link(self.root, x)
+        self.n += 1
+        return x
+
+    def union(self, h1):
+        """
+        unites self and h1, h1 is left empty
+        :param h1: PairingHeap
+        """
+        if h1.root is not None:
+            self.root = h1.root if self.root is None else self.link(self.root, h1.root)
+        self.n += h1.n
+        h1.root = None
+        h1.n = 0
+
+    def extract_min(self):
+        """
+        extract the node with the minimum key
+        :return: Node, None if heap is empty
+        """
+        z = self.root
+        if z is not None:
+            self.root = self.merge_pairs(z.child) if z.child is not None else None
+            z.child = None
+            self.n -= 1
+        return z
+
+    def drain(self, payloads=False):
+        """
+        extract every node in increasing key order, see heap_iter.drain
+        :param payloads: bool, yield payloads instead of keys
+        :return: generator of keys or payloads
+        """
+        return heap_iter.drain(self, payloads)
+
+    def decrease_key(self, x, k):
+        """
+        decrease the key of x into k
+        :param x: Node
+        :param k: new key
+        :raise Exception if k is greater than current key
+        """
+        if k > x.key:
+            raise Exception('new key is greater than current key')
+        x.key = k
+        if x is not self.root:
+            self.cut(x)
+            self.root = self.link(self.root, x)
+
+    def delete(self, x):
+        """
+        delete node x
+        :param x: Node
+        """
+        if x is self.root:
+            self.extract_min()
+            return
+        self.cut(x)
+        if x.child is not None:
+            self.root = self.link(self.root, self.merge_pairs(x.child))
+            x.child = None
+        self.n -= 1
+
+
+class TestPairingHeap(unittest.TestCase):
+    def test_insert_extract(self):
+        keys = [12, 7, 25, 15, 33, 28, 41, 18, 3, 37, 1, 50, 7]
+        h = PairingHeap()
+        for k in keys:
+            h.insert(Node(k, str(k)))
+        self.assertEqual(h.n, 13)
+        self.assertEqual(h.minimum().key, 1)
+        out = []
+        while h.n:
+            x = h.extract_min()
+            self.assertEqual(x.payload, str(x.key))
+            self.assertEqual((x.child, x.sibling, x.prev), (None, None, None))
+            out.append(x.key)
+        self.assertEqual(out, sorted(keys))
+        self.assertEqual(h.extract_min(), None)
+
+    def test_drain(self):
+        keys = [12, 7, 25, 15, 33, 28, 41, 18, 3, 37, 1, 50, 7]
+        h = PairingHeap.from_iterable(keys)
+        self.assertEqual(h.n, 13)
+        drain = h.drain()
+        self.assertEqual([next(drain) for _ in range(3)], [1, 3, 7])
+        self.assertEqual(h.n, 10)
+        self.assertEqual(list(drain), sorted(keys)[3:])
+        self.assertEqual(h.root, None)
+
+    def test_union(self):
+        h1 = PairingHeap()
+        h2 = PairingHeap()
+        for k in range(0, 40, 3):
+            h1.insert(Node(k))
+        for k in range(1, 40, 2):
+            h2.insert(Node(k))
+        h1.union(h2)
+        self.assertEqual((h1.n, h2.n, h2.root), (34, 0, None))
+        out = [h1.extract_min().key for _ in range(34)]
+        self.assertEqual(out, sorted(list(range(0, 40, 3)) + list(range(1, 40, 2))))
+
+    def test_decrease_key_delete(self):
+        rng = random.Random(2)
+        h = PairingHeap()
+        nodes = [Node(rng.randint(0, 1000)) for _ in range(300)]
+        for x in nodes:
+            h.insert(x)
+        live = set(nodes)
+        while live:
+            for _ in range(3):
+                x = nodes[rng.randrange(len(nodes))]
+                if x not in live:
+                    continue
+                if rng.random() < 0.3:
+                    h.delete(x)
+                    live.remove(x)
+                else:
+                    h.decrease_key(x, x.key - rng.randint(0, 500))
+            if not live:
+                break
+            z = h.extract_min()
+            self.assertEqual(z.key, min(x.key for x in live))
+            live.remove(z)
+            self.assertEqual(h.n, len(live))
+        self.assertEqual((h.n, h.root), (0, None))
+        x = Node(5)
+        h.insert(x)
+        self.assertRaises(Exception, h.decrease_key, x, 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
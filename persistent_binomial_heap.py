@@ -0,0 +1,195 @@
+import unittest
+
+
+class Tree(object):
+    """
+    immutable binomial tree, children is a cons list (tree, rest) of subtrees in decreasing rank
+    """
+    __slots__ = ('rank', 'key', 'payload', 'children')
+
+    def __init__(self, rank, key, payload, children):
+        self.rank = rank
+        self.key = key
+        self.payload = payload
+        self.children = children
+
+
+def link(t1, t2):
+    """
+    a new tree of rank r + 1 made of two trees of rank r, sharing both of them
+    :param t1: Tree
+    :param t2: Tree, same rank as t1
+    :return: Tree
+    """
+    if t2.key < t1.key:
+        t1, t2 = t2, t1
+    return Tree(t1.rank + 1, t1.key, t1.payload, (t2, t1.children))
+
+
+def meld(ts1, ts2):
+    """
+    merge two root lists, carrying equal-rank trees like a binary counter
+    only the O(log n) cons cells of the root list are new, every tree is shared
+    :param ts1: cons list of trees in increasing rank
+    :param ts2: cons list of trees in increasing rank
+    :return: cons list of trees in increasing rank
+    """
+    if ts1 is None:
+        return ts2
+    if ts2 is None:
+        return ts1
+    trees = []
+    while ts1 is not None or ts2 is not None:
+        if ts2 is None or (ts1 is not None and ts1[0].rank <= ts2[0].rank):
+            t, ts1 = ts1
+        else:
+            t, ts2 = ts2
+        while t.rank < len(trees) and trees[t.rank] is not None:
+            u = trees[t.rank]
+            trees[t.rank] = None
+            t = link(u, t)
+        while t.rank >= len(trees):
+            trees.append(None)
+        trees[t.rank] = t
+    ts = None
+    for t in reversed(trees):
+        if t is not None:
+            ts = (t, ts)
+    return ts
+
+
+class PersistentBinomialHeap(object):
+    """
+    binomial heap whose operations return new versions and never change existing ones
+    versions share every tree they have in common, so keeping a snapshot costs O(1)
+    """
+    __slots__ = ('roots', 'n', 'min')
+
+    def __init__(self, roots=None, n=0):
+        self.roots = roots
+        self.n = n
+        # min tree, found on first use
+        self.min = None
+
+    def __len__(self):
+        return self.n
+
+    def insert(self, key, payload=None):
+        """
+        a new version with key added
+        :param key: key
+        :param payload: payload of the key
+        :return: PersistentBinomialHeap
+        """
+        t = Tree(0, key, payload, None)
+        ts = self.roots
+        # carry like incrementing a binary counter
+        while ts is not None and ts[0].rank == t.rank:
+            t = link(t, ts[0])
+            ts = ts[1]
+        return PersistentBinomialHeap((t, ts), self.n + 1)
+
+    def minimum(self):
+        """
+        return the tree holding the min key
+        :return: Tree with key and payload, None if heap is empty
+        """
+        if self.min is None and self.roots is not None:
+            ts = self.roots
+            m = ts[0]
+            while ts is not None:
+                if ts[0].key < m.key:
+                    m = ts[0]
+                ts = ts[1]
+            self.min = m
+        return self.min
+
+    def extract_min(self):
+        """
+        a new version without the min key
+        :return: (Tree holding the min key, PersistentBinomialHeap), (None, self) if heap is empty
+        """
+        m = self.minimum()
+        if m is None:
+            return None, self
+        # copy the root list up to m, share the rest
+        before = []
+        ts = self.roots
+        while ts[0] is not m:
+            before.append(ts[0])
+            ts = ts[1]
+        rest = ts[1]
+        for t in reversed(before):
+            rest = (t, rest)
+        # children are in decreasing rank, reverse them into a root list
+        children = None
+        c = m.children
+        while c is not None:
+            children = (c[0], children)
+            c = c[1]
+        return m, PersistentBinomialHeap(meld(rest, children), self.n - 1)
+
+    def union(self, h1):
+        """
+        a new version holding the keys of self and h1
+        :param h1: PersistentBinomialHeap
+        :return: PersistentBinomialHeap
+        """
+        return PersistentBinomialHeap(meld(self.roots, h1.roots), self.n + h1.n)
+
+
+class TestPersistentBinomialHeap(unittest.TestCase):
+    def drain(self, h):
+        keys = []
+        while len(h):
+            m, h = h.extract_min()
+            keys.append(m.key)
+        return keys
+
+    def test_insert_extract(self):
+        keys = [12, 7, 25, 15, 33, 28, 41, 18, 3, 37, 1, 50]
+        h = PersistentBinomialHeap()
+        for k in keys:
+            h = h.insert(k, str(k))
+        self.assertEqual(len(h), 12)
+        self.assertEqual((h.minimum().key, h.minimum().payload), (1, '1'))
+        self.assertEqual(self.drain(h), sorted(keys))
+        self.assertEqual(PersistentBinomialHeap().extract_min()[0], None)
+
+    def test_snapshots(self):
+        h = PersistentBinomialHeap()
+        versions = [h]
+        for k in [5, 3, 8, 1, 9, 2, 7]:
+            h = h.insert(k)
+            versions.append(h)
+        snapshot = h
+        m, h2 = h.extract_min()
+        h3 = h2.insert(0)
+        self.assertEqual(m.key, 1)
+        self.assertEqual(self.drain(snapshot), [1, 2, 3, 5, 7, 8, 9])
+        self.assertEqual(self.drain(h3), [0, 2, 3, 5, 7, 8, 9])
+        for i, v in enumerate(versions):
+            self.assertEqual(self.drain(v), sorted([5, 3, 8, 1, 9, 2, 7][:i]))
+
+    def test_union(self):
+        h1 = PersistentBinomialHeap()
+        h2 = PersistentBinomialHeap()
+        for k in range(0, 40, 3):
+            h1 = h1.insert(k)
+        for k in range(1, 40, 2):
+            h2 = h2.insert(k)
+        h = h1.union(h2)
+        self.assertEqual(len(h), len(h1) + len(h2))
+        self.assertEqual(self.drain(h), sorted(list(range(0, 40, 3)) + list(range(1, 40, 2))))
+        self.assertEqual(self.drain(h1), list(range(0, 40, 3)))
+        # the root list of a union has at most one tree per rank
+        ranks = []
+        ts = h.roots
+        while ts is not None:
+            ranks.append(ts[0].rank)
+            ts = ts[1]
+        self.assertEqual(ranks, sorted(set(ranks)))
+
+
+if __name__ == '__main__':
+    unittest.main()
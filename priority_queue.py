@@ -0,0 +1,288 @@
+import math
+import random
+import time
+import unittest
+
+import binomial_heap
+import fibonacci_heap
+import pairing_heap
+
+# engine name -> (heap class, node class)
+ENGINES = {
+    'binomial': (binomial_heap.BinomialHeap, binomial_heap.Node),
+    'fibonacci': (fibonacci_heap.FibonacciHeap, fibonacci_heap.Node),
+    'pairing': (pairing_heap.PairingHeap, pairing_heap.Node),
+}
+
+# operations of a workload profile
+PROFILE_OPERATIONS = ('insert', 'extract_min', 'decrease_key', 'delete', 'union')
+
+# heap size -> engine name -> {operation: microseconds per call}, measured by sample_costs(size)
+# under CPython 2.7, best of 3 seeds
+ENGINE_COSTS = {
+    1000: {
+        'binomial': {'insert': 5.3, 'extract_min': 15.6, 'decrease_key': 2.1, 'delete': 18.4, 'union': 3.1},
+        'fibonacci': {'insert': 0.6, 'extract_min': 16.1, 'decrease_key': 1.5, 'delete': 8.8, 'union': 0.7},
+        'pairing': {'insert': 0.8, 'extract_min': 7.4, 'decrease_key': 1.1, 'delete': 0.8, 'union': 0.7},
+    },
+    10000: {
+        'binomial': {'insert': 5.7, 'extract_min': 21.0, 'decrease_key': 2.0, 'delete': 26.4, 'union': 3.4},
+        'fibonacci': {'insert': 0.6, 'extract_min': 22.6, 'decrease_key': 1.4, 'delete': 10.9, 'union': 0.7},
+        'pairing': {'insert': 0.8, 'extract_min': 9.8, 'decrease_key': 1.1, 'delete': 1.5, 'union': 0.7},
+    },
+    100000: {
+        'binomial': {'insert': 6.4, 'extract_min': 26.7, 'decrease_key': 2.4, 'delete': 37.6, 'union': 3.8},
+        'fibonacci': {'insert': 0.8, 'extract_min': 27.7, 'decrease_key': 1.6, 'delete': 13.2, 'union': 0.7},
+        'pairing': {'insert': 0.9, 'extract_min': 16.0, 'decrease_key': 1.6, 'delete': 1.9, 'union': 0.9},
+    },
+}
+
+
+def sample_costs(size=1000, calls=500, seed=0):
+    """
+    measure the cost of every profile operation with every engine, on heaps of the given size
+    :param size: int, number of keys in the heap while operations are timed
+    :param calls: int, number of timed calls per operation
+    :param seed: int, random seed
+    :return: dict, engine name -> {operation: microseconds per call}
+    """
+    calls = min(calls, size // 3)
+    costs = {}
+    for engine, (heap_class, node_class) in ENGINES.items():
+        rng = random.Random(seed)
+        h = heap_class()
+        nodes = [node_class(rng.random()) for _ in range(size + calls)]
+        handles = [h.insert(x) for x in nodes[:size]]
+        t = time.time()
+        for x in nodes[size:]:
+            handles.append(h.insert(x))
+        c = {'insert': time.time() - t}
+        # the first extract_min calls after a run of inserts consolidate or pair the whole root list,
+        # as many untimed calls bring the heap to steady state, holding size keys again
+        for _ in range(calls):
+            h.extract_min()
+        t = time.time()
+        for _ in range(calls):
+            last = h.extract_min().key
+        c['extract_min'] = time.time() - t
+        # the keys are distinct, so the nodes left are the ones with keys above the last extracted
+        live = [x for x in handles if x.key > last]
+        rng.shuffle(live)
+        t = time.time()
+        for x in live[:calls]:
+            h.decrease_key(x, x.key / 2)
+        c['decrease_key'] = time.time() - t
+        t = time.time()
+        for x in live[calls:2 * calls]:
+            h.delete(x)
+        c['delete'] = time.time() - t
+        others = []
+        for _ in range(calls):
+            h1 = heap_class()
+            h1.insert(node_class(rng.random()))
+            others.append(h1)
+        t = time.time()
+        for h1 in others:
+            h.union(h1)
+        c['union'] = time.time() - t
+        costs[engine] = dict((op, 1e6 * c[op] / calls) for op in PROFILE_OPERATIONS)
+    return costs
+
+
+def engine_costs(size):
+    """
+    the costs of ENGINE_COSTS at a heap size, interpolated linearly in log(size) between the two
+    measured sizes around it, and clamped to the smallest or largest measured size outside of them
+    :param size: int, number of keys in the heap
+    :return: dict, engine name -> {operation: microseconds per call}
+    """
+    sizes = sorted(ENGINE_COSTS)
+    size = min(max(size, sizes[0]), sizes[-1])
+    i = 1
+    while sizes[i] < size:
+        i += 1
+    lo, hi = sizes[i - 1], sizes[i]
+    w = math.log(float(size) / lo) / math.log(float(hi) / lo)
+    return dict((engine, dict((op, (1 - w) * ENGINE_COSTS[lo][engine][op] + w * ENGINE_COSTS[hi][engine][op])
+                              for op in PROFILE_OPERATIONS))
+                for engine in ENGINES)
+
+
+def select_engine(profile, sample=False):
+    """
+    pick the engine whose cost for a workload profile is the lowest
+    :param profile: dict, operation name -> relative number of calls, and optionally 'size',
+                    the expected number of keys, 1000 by default, for example
+                    {'insert': 5, 'extract_min': 3, 'decrease_key': 2, 'size': 50000}
+    :param sample: bool, measure the costs with a short sample_costs run at the profile size,
+                   instead of interpolating ENGINE_COSTS at it
+    :return: str, key of ENGINES
+    :raise Exception if the profile has an unknown operation
+    """
+    for op in profile:
+        if op != 'size' and op not in PROFILE_OPERATIONS:
+            raise Exception('unknown operation in profile: ' + str(op))
+    size = profile.get('size', 1000)
+    costs = sample_costs(size) if sample else engine_costs(size)
+
+    def cost(engine):
+        return sum(profile.get(op, 0) * costs[engine][op] for op in PROFILE_OPERATIONS)
+    return min(sorted(costs), key=cost)
+
+
+def heapsort(iterable, engine='pairing'):
+    """
+    the keys of iterable in increasing order, built in O(n) and extracted lazily, so taking the first
+    k keys costs O(n + k log n)
+    :param iterable: iterable of keys
+    :param engine: str, key of ENGINES, pairing is the fastest to drain
+    :return: generator of keys
+    """
+    if engine not in ENGINES:
+        raise Exception('unknown heap engine: ' + str(engine))
+    return ENGINES[engine][0].from_iterable(iterable).drain()
+
+
+class PriorityQueue:
+    """
+    addressable priority queue over one of the heap engines
+    items are stored as node payloads, and self.index maps each item to the handle insert returned for it
+    """
+    def __init__(self, engine='fibonacci'):
+        if engine not in ENGINES:
+            raise Exception('unknown heap engine: ' + str(engine))
+        heap_class, self.node_class = ENGINES[engine]
+        self.engine = engine
+        self.heap = heap_class()
+        self.index = {}
+
+    @classmethod
+    def for_workload(cls, profile, sample=False):
+        """
+        a queue over the engine select_engine picks for profile
+        :param profile: dict, workload profile, see select_engine
+        :param sample: bool, pick from a short sampling run instead of the measured ENGINE_COSTS
+        :return: PriorityQueue
+        """
+        return cls(select_engine(profile, sample))
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, item):
+        return item in self.index
+
+    def push(self, item, priority):
+        """
+        add item with the given priority
+        :param item: hashable item, not already in the queue
+        :param priority: key of item
+        :raise Exception if item is already in the queue
+        """
+        if item in self.index:
+            raise Exception('item is already in the queue')
+        self.index[item] = self.heap.insert(self.node_class(priority, item))
+
+    def peek(self):
+        """
+        the item with minimum priority, without removing it
+        :return: (item, priority)
+        :raise Exception if the queue is empty
+        """
+        x = self.heap.minimum()
+        if x is None:
+            raise Exception('peek from an empty queue')
+        return x.payload, x.key
+
+    def pop(self):
+        """
+        remove and return the item with minimum priority
+        :return: (item, priority)
+        :raise Exception if the queue is empty
+        """
+        x = self.heap.extract_min()
+        if x is None:
+            raise Exception('pop from an empty queue')
+        del self.index[x.payload]
+        return x.payload, x.key
+
+    def update(self, item, priority):
+        """
+        change the priority of item, with decrease_key when it goes down
+        :param item: item in the queue
+        :param priority: new key of item
+        """
+        x = self.index[item]
+        if priority <= x.key:
+            self.heap.decrease_key(x, priority)
+        else:
+            self.heap.delete(x)
+            self.index[item] = self.heap.insert(self.node_class(priority, item))
+
+    def remove(self, item):
+        """
+        remove item from the queue
+        :param item: item in the queue
+        """
+        self.heap.delete(self.index.pop(item))
+
+
+class TestPriorityQueue(unittest.TestCase):
+    def test_operations(self):
+        for engine in sorted(ENGINES):
+            q = PriorityQueue(engine)
+            for i, item in enumerate('abcdefgh'):
+                q.push(item, 10 * (i + 1))
+            self.assertEqual(len(q), 8)
+            self.assertTrue('c' in q)
+            self.assertFalse('z' in q)
+            self.assertRaises(Exception, q.push, 'a', 1)
+            self.assertEqual(q.peek(), ('a', 10))
+            q.update('h', 5)
+            q.update('a', 100)
+            q.remove('c')
+            self.assertFalse('c' in q)
+            out = []
+            while len(q):
+                out.append(q.pop())
+            self.assertEqual(out, [('h', 5), ('b', 20), ('d', 40), ('e', 50),
+                                   ('f', 60), ('g', 70), ('a', 100)])
+            self.assertRaises(Exception, q.pop)
+            self.assertRaises(Exception, q.peek)
+        self.assertRaises(Exception, PriorityQueue, 'nope')
+
+    def test_heapsort(self):
+        keys = [(k * 37) % 101 for k in range(300)]
+        for engine in sorted(ENGINES):
+            self.assertEqual(list(heapsort(keys, engine)), sorted(keys))
+            first = heapsort(iter(keys), engine)
+            self.assertEqual([next(first) for _ in range(5)], sorted(keys)[:5])
+        self.assertEqual(list(heapsort([])), [])
+        self.assertRaises(Exception, heapsort, keys, 'nope')
+
+    def test_select_engine(self):
+        costs = sample_costs(size=200, calls=50)
+        self.assertEqual(sorted(costs), sorted(ENGINES))
+        for engine in costs:
+            self.assertEqual(sorted(costs[engine]), sorted(PROFILE_OPERATIONS))
+            self.assertTrue(min(costs[engine].values()) > 0)
+        for size in ENGINE_COSTS:
+            self.assertEqual(sorted(ENGINE_COSTS[size]), sorted(ENGINES))
+            self.assertEqual(engine_costs(size), ENGINE_COSTS[size])
+        self.assertEqual(engine_costs(10), engine_costs(1000))
+        self.assertEqual(engine_costs(10 ** 7), engine_costs(100000))
+        mid = engine_costs(int(math.sqrt(1000 * 10000)))['pairing']['extract_min']
+        self.assertAlmostEqual(mid, (7.4 + 9.8) / 2, places=1)
+        # pairing heaps have the cheapest extract_min and delete at every size, Fibonacci heaps the cheapest insert
+        for size in (10, 5000, 100000):
+            self.assertEqual(select_engine({'insert': 1, 'extract_min': 1, 'delete': 1, 'size': size}), 'pairing')
+            self.assertEqual(select_engine({'insert': 1, 'size': size}), 'fibonacci')
+        profile = {'insert': 5, 'extract_min': 3, 'decrease_key': 2, 'size': 500}
+        self.assertTrue(select_engine(profile) in ENGINES)
+        self.assertTrue(select_engine(profile, sample=True) in ENGINES)
+        self.assertEqual(PriorityQueue.for_workload(profile).engine, select_engine(profile))
+        self.assertRaises(Exception, select_engine, {'push': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
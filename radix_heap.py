@@ -0,0 +1,203 @@
+import numbers
+import random
+import unittest
+
+
+class Node(object):
+    """
+    node of a RadixHeap, bucket and index locate it in self.buckets of its heap
+    """
+    __slots__ = ('key', 'payload', 'bucket', 'index')
+
+    def __init__(self, key, payload=None):
+        self.key = key
+        self.payload = payload
+        self.bucket = None
+        self.index = None
+
+    def __str__(self):
+        return str(self.key)
+
+
+class RadixHeap:
+    """
+    monotone priority queue of non-negative integer keys: no key below the last extracted one is accepted
+    bucket i holds the keys whose highest bit differing from self.last is bit i - 1, so bucket 0 holds
+    keys equal to self.last. extract_min only compares keys when it empties the lowest non-empty
+    bucket, and every node moves to a lower bucket at most once per bit of the keys
+    """
+    def __init__(self):
+        self.buckets = [[]]
+        # last extracted key, lower bound of every key in the heap
+        self.last = 0
+        self.n = 0
+
+    def place(self, x):
+        """
+        put x in the bucket of its key
+        :param x: Node
+        """
+        b = (x.key ^ self.last).bit_length()
+        buckets = self.buckets
+        while b >= len(buckets):
+            buckets.append([])
+        x.bucket = b
+        x.index = len(buckets[b])
+        buckets[b].append(x)
+
+    def unplace(self, x):
+        """
+        take x out of its bucket, moving the last node of the bucket into its place
+        :param x: Node
+        """
+        bucket = self.buckets[x.bucket]
+        y = bucket.pop()
+        if y is not x:
+            bucket[x.index] = y
+            y.index = x.index
+        x.bucket = x.index = None
+
+    def check(self, k):
+        """
+        :raise Exception if k is not an integer key the heap accepts
+        """
+        if not isinstance(k, numbers.Integral):
+            raise Exception('key is not an integer')
+        if k < self.last:
+            raise Exception('key is less than the last extracted key')
+
+    def insert(self, x):
+        """
+        insert node x, self.n += 1
+        :param x: Node
+        :return: Node, x is its own handle
+        :raise Exception if x.key is less than the last extracted key
+        """
+        self.check(x.key)
+        self.place(x)
+        self.n += 1
+        return x
+
+    def minimum(self):
+        """
+        return the node with the minimum key
+        :return: Node, None if heap is empty
+        """
+        for bucket in self.buckets:
+            if bucket:
+                return min(bucket, key=lambda x: x.key)
+        return None
+
+    def extract_min(self):
+        """
+        extract the node with the minimum key, redistributing the lowest non-empty bucket if needed
+        :return: Node, None if heap is empty
+        """
+        if self.n == 0:
+            return None
+        buckets = self.buckets
+        if not buckets[0]:
+            i = 1
+            while not buckets[i]:
+                i += 1
+            bucket = buckets[i]
+            buckets[i] = []
+            self.last = min(x.key for x in bucket)
+            for x in bucket:
+                self.place(x)
+        x = buckets[0].pop()
+        x.bucket = x.index = None
+        self.n -= 1
+        return x
+
+    def decrease_key(self, x, k):
+        """
+        decrease the key of x into k
+        :param x: Node
+        :param k: int, new key
+        :raise Exception if k is greater than current key, or less than the last extracted key
+        """
+        if k > x.key:
+            raise Exception('new key is greater than current key')
+        self.check(k)
+        self.unplace(x)
+        x.key = k
+        self.place(x)
+
+    def delete(self, x):
+        """
+        delete node x
+        :param x: Node
+        """
+        self.unplace(x)
+        self.n -= 1
+
+
+class TestRadixHeap(unittest.TestCase):
+    def test_insert_extract(self):
+        keys = [12, 7, 25, 15, 33, 28, 41, 18, 3, 37, 1, 50, 7]
+        h = RadixHeap()
+        for k in keys:
+            h.insert(Node(k, str(k)))
+        self.assertEqual(h.n, 13)
+        self.assertEqual(h.minimum().key, 1)
+        out = []
+        while h.n:
+            x = h.extract_min()
+            self.assertEqual(x.payload, str(x.key))
+            out.append(x.key)
+        self.assertEqual(out, sorted(keys))
+        self.assertEqual(h.extract_min(), None)
+        self.assertEqual(h.minimum(), None)
+
+    def test_monotone(self):
+        h = RadixHeap()
+        for k in (10, 20, 30):
+            h.insert(Node(k))
+        self.assertEqual(h.extract_min().key, 10)
+        h.insert(Node(10))
+        self.assertRaises(Exception, h.insert, Node(9))
+        self.assertRaises(Exception, h.insert, Node(12.5))
+        self.assertRaises(Exception, h.insert, Node(12.0))
+        x = Node(25)
+        h.insert(x)
+        self.assertRaises(Exception, h.decrease_key, x, 5)
+        self.assertRaises(Exception, h.decrease_key, x, 26)
+        self.assertEqual(x.key, 25)
+        self.assertEqual(h.n, 4)
+
+    def test_decrease_key_delete(self):
+        rng = random.Random(1)
+        h = RadixHeap()
+        nodes = [Node(rng.randint(0, 1000)) for _ in range(300)]
+        for x in nodes:
+            h.insert(x)
+        live = set(nodes)
+        for i in range(400):
+            for _ in range(3):
+                x = nodes[rng.randrange(len(nodes))]
+                if x not in live:
+                    continue
+                if rng.random() < 0.3:
+                    h.delete(x)
+                    live.remove(x)
+                else:
+                    h.decrease_key(x, rng.randint(h.last, x.key))
+            if i < 100:
+                x = Node(h.last + rng.randint(0, 100))
+                h.insert(x)
+                nodes.append(x)
+                live.add(x)
+            if not live:
+                break
+            z = h.extract_min()
+            self.assertEqual(z.key, min(x.key for x in live))
+            self.assertEqual(z.bucket, None)
+            live.remove(z)
+            self.assertEqual(h.n, len(live))
+        self.assertEqual(h.n, 0)
+        self.assertEqual(h.extract_min(), None)
+
+
+if __name__ == '__main__':
+    unittest.main()